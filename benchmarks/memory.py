@@ -0,0 +1,38 @@
+"""Report memory used by a warm ``Extractor`` and per extracted document.
+
+Run with ``python -m benchmarks.memory``.
+"""
+from functools import partial
+
+from benchmarks.tokenizers import CORPUS
+
+from location_extractor.extractor import Extractor
+from location_extractor.memory import allocations_peak, memory_usage
+
+MEBIBYTE = 1024 * 1024
+
+
+def main() -> None:
+    rss_before, _ = memory_usage()
+    extractor = Extractor()
+    report = extractor.memory_report()
+    for component, size in report.components.items():
+        print(f'{component}: {size / MEBIBYTE:.1f} MiB')  # noqa: WPS421
+    print(  # noqa: WPS421
+        f'components: {report.total / MEBIBYTE:.1f} MiB, '
+        f'RSS growth: {(report.rss - rss_before) / MEBIBYTE:.1f} MiB',
+    )
+
+    peaks = [
+        allocations_peak(partial(extractor.extract_locations, text))[1]
+        for text in CORPUS
+    ]
+    print(  # noqa: WPS421
+        'extract_locations allocations peak: '
+        f'max {max(peaks) / 1024:.1f} KiB, '
+        f'mean {sum(peaks) / len(peaks) / 1024:.1f} KiB per document',
+    )
+
+
+if __name__ == '__main__':
+    main()
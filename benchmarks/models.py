@@ -0,0 +1,45 @@
+"""Compare NLTK models with ones compiled to ``numpy`` arrays.
+
+Run with ``python -m benchmarks.models``.
+"""
+import time
+import timeit
+
+from typing import List
+
+from benchmarks.tokenizers import ARTICLE, CORPUS
+
+from location_extractor.named_entity_recognition.ner import NERExtractor
+
+REPEAT = 3
+
+
+def measure(compiled: bool) -> List[List[str]]:
+    extractor = NERExtractor(compiled=compiled)
+    started = time.perf_counter()
+    extractor.load_models()
+    load_time = time.perf_counter() - started
+    tokens = extractor.tokenize(ARTICLE)
+    elapsed = min(timeit.repeat(
+        lambda: extractor.chunker.parse(extractor.tagger.tag(tokens)),
+        number=1,
+        repeat=REPEAT,
+    ))
+    entities = [extractor.find_entities(text) for text in CORPUS]
+    name = 'compiled' if compiled else 'nltk'
+    print(  # noqa: WPS421
+        f'{name}: loaded in {load_time:.2f}s, '
+        f'{len(tokens) / elapsed:,.0f} tokens/s',
+    )
+    return entities
+
+
+def main() -> None:
+    # compile models first, so that loading them is measured
+    NERExtractor(compiled=True).load_models()
+    if measure(compiled=False) != measure(compiled=True):
+        print('compiled models found different entities')  # noqa: WPS421
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Measure how ``DBClient`` scales with synthetic gazetteers.
+
+Run with ``python -m benchmarks.scaling [scale ...]``, scales default to
+1, 10 and 100 times ``BASE_CITIES_COUNT`` cities.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from typing import List
+
+from location_extractor.clients import DBClient
+from location_extractor.synthetic import (
+    GazetteerSpec,
+    generate_locations,
+    write_locations_csv,
+)
+
+DEFAULT_SCALES = (1, 10, 100)
+MEBIBYTE = 1024 * 1024
+LOOKUPS = 1000
+LOOKUP_BATCH = 20
+REPEAT = 3
+
+
+def sample_city_names(spec: GazetteerSpec, count: int) -> List[str]:
+    names = sorted({
+        city_name
+        for *_, city_name, _ in generate_locations(spec)
+        if city_name
+    })
+    return random.Random(spec.seed).sample(names, min(count, len(names)))
+
+
+def measure(spec: GazetteerSpec, directory: str) -> None:
+    locations_path = os.path.join(directory, f'locations-{spec.scale}.csv')
+    dbpath = os.path.join(directory, f'data-{spec.scale}.db')
+    rows_count = write_locations_csv(spec, locations_path)
+
+    started = time.perf_counter()
+    dbclient = DBClient(dbpath=dbpath, locations_path=locations_path)
+    build_time = time.perf_counter() - started
+    db_size = os.path.getsize(dbpath) / MEBIBYTE
+
+    tracemalloc.start()
+    dbclient.name_index  # noqa: WPS428
+    _, index_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    names = sample_city_names(spec, LOOKUPS)
+    fetch_latency = min(timeit.repeat(
+        lambda: [dbclient.fetch_all('city_name', name) for name in names],
+        number=1,
+        repeat=REPEAT,
+    )) / len(names)
+    batches = [
+        names[index:index + LOOKUP_BATCH]
+        for index in range(0, len(names), LOOKUP_BATCH)
+    ]
+    lookup_latency = min(timeit.repeat(
+        lambda: [dbclient.lookup_names(batch) for batch in batches],
+        number=1,
+        repeat=REPEAT,
+    )) / len(batches)
+
+    print(  # noqa: WPS421
+        f'{spec.scale}x ({rows_count:,} rows): '
+        f'build {build_time:.2f}s, DB {db_size:.1f} MiB, '
+        f'name index {index_memory / MEBIBYTE:.1f} MiB, '
+        f'fetch_all {fetch_latency * 1000:.3f} ms/name, '
+        f'lookup_names {lookup_latency * 1000:.3f} ms/'
+        f'{LOOKUP_BATCH} names',
+    )
+
+
+def main() -> None:
+    scales = [float(scale) for scale in sys.argv[1:]] or DEFAULT_SCALES
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            measure(GazetteerSpec(scale=scale), directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Compare ``NERExtractor`` tokenizers throughput and found entities.
+
+Run with ``python -m benchmarks.tokenizers``.
+"""
+import timeit
+
+from location_extractor.named_entity_recognition.ner import NERExtractor
+from location_extractor.named_entity_recognition.tokenizers import TOKENIZERS
+
+CORPUS = (
+    'Perfect just Perfect! It\'s a perfect storm for Nairobi on a Friday '
+    'evening! horrible traffic here is your cue to become worse @Ma3Route',
+    'It is early morning in Nairobi, the Kenyan capital. The traffic jam '
+    'along Ngong Road has already built up.',
+    'There is a city called São Paulo in Brazil.',
+    'London, Warsaw, Czechia, Western Europe',
+    'She went to south america then moved to Hawaii and flew to Australia.',
+    'Plumber in Worcester, Massachusetts. Mr. Smith\'s company "Acme" '
+    'opened offices in the U.S. and in Berlin, Germany, for $3.88 million.',
+)
+ARTICLE = ' '.join(CORPUS * 50)
+REPEAT = 5
+
+
+def measure_throughput(tokenizer: str) -> float:
+    """Return characters tokenized per second."""
+    tokenize = TOKENIZERS[tokenizer]
+    elapsed = min(timeit.repeat(
+        lambda: tokenize(ARTICLE),
+        number=1,
+        repeat=REPEAT,
+    ))
+    return len(ARTICLE) / elapsed
+
+
+def measure_agreement(tokenizer: str) -> float:
+    """Return Jaccard similarity of entities found with ``treebank``."""
+    reference = NERExtractor('treebank')
+    extractor = NERExtractor(tokenizer)
+    common = total = 0
+    for text in CORPUS:
+        expected = set(reference.find_entities(text))
+        found = set(extractor.find_entities(text))
+        common += len(expected & found)
+        total += len(expected | found)
+    return common / total if total else 1.0
+
+
+def main() -> None:
+    for tokenizer in TOKENIZERS:
+        print(  # noqa: WPS421
+            f'{tokenizer}: {measure_throughput(tokenizer):,.0f} chars/s, '
+            f'entities agreement {measure_agreement(tokenizer):.2%}',
+        )
+
+
+if __name__ == '__main__':
+    main()
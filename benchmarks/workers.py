@@ -0,0 +1,68 @@
+"""Compare ``WarmPool`` workers with workers loading their own models.
+
+Run with ``python -m benchmarks.workers [processes]``.
+"""
+import multiprocessing
+import sys
+import time
+
+from typing import List
+
+from location_extractor.extractor import Extractor
+from location_extractor.memory import memory_usage
+from location_extractor.workers import WarmPool, WorkerStats
+
+MEBIBYTE = 1024 * 1024
+
+
+def _init_cold_worker(
+    started: float,
+    stats_queue: multiprocessing.Queue,
+) -> None:
+    Extractor().extractor.load_models()
+    rss, private = memory_usage()
+    stats_queue.put(WorkerStats(
+        pid=0,
+        spawn_time=time.perf_counter() - started,
+        rss=rss,
+        private=private,
+    ))
+
+
+def cold_workers_stats(processes: int) -> List[WorkerStats]:
+    context = multiprocessing.get_context('spawn')
+    stats_queue = context.Queue()
+    pool = context.Pool(
+        processes,
+        initializer=_init_cold_worker,
+        initargs=(time.perf_counter(), stats_queue),
+    )
+    stats = [stats_queue.get() for _ in range(processes)]
+    pool.close()
+    pool.join()
+    return stats
+
+
+def report(name: str, stats: List[WorkerStats]) -> None:
+    spawn_time = max(worker.spawn_time for worker in stats)
+    rss = sum(worker.rss for worker in stats) / len(stats) / MEBIBYTE
+    private = [worker.private for worker in stats if worker.private]
+    private_report = (
+        f', private {sum(private) / len(private) / MEBIBYTE:.1f} MiB'
+        if private else ''
+    )
+    print(  # noqa: WPS421
+        f'{name}: all ready after {spawn_time:.2f}s, '
+        f'RSS {rss:.1f} MiB per worker{private_report}',
+    )
+
+
+def main() -> None:
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    with WarmPool(processes) as pool:
+        report('warm fork', pool.workers_stats)
+    report('cold spawn', cold_workers_stats(processes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import hashlib
+import math
+import struct
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from typing_extensions import Final
+
+from location_extractor.utils import atomic_write
+
+#: size in bits, hash functions count and stamp
+_HEADER: Final = struct.Struct('<QIq')
+_BYTE_SIZE: Final = 8
+#: bytes of digest split into two hashes
+_DIGEST_SIZE: Final = 16
+
+
+@dataclass
+class FilterStats:
+    """Counters of names checked against ``BloomFilter``."""
+
+    checked: int = 0
+    rejected: int = 0
+
+
+class BloomFilter:
+    """Probabilistic set of strings with no false negatives.
+
+    ``stamp`` identifies the version of data the filter was built from, it
+    is stored with the filter, so stale filters can be detected.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        hash_count: int,
+        bits: Optional[bytearray] = None,
+        stamp: int = 0,
+    ) -> None:
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bits or bytearray(math.ceil(size / _BYTE_SIZE))
+        self.stamp = stamp
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        return all(
+            self.bits[position // _BYTE_SIZE] & (1 << position % _BYTE_SIZE)
+            for position in _positions(name, self.size, self.hash_count)
+        )
+
+    @classmethod
+    def for_capacity(
+        cls,
+        capacity: int,
+        false_positive_rate: float,
+    ) -> 'BloomFilter':
+        """Create filter sized for ``capacity`` names."""
+        capacity = max(capacity, 1)
+        size = math.ceil(
+            -capacity * math.log(false_positive_rate) / math.log(2) ** 2,
+        )
+        bits_per_name = size / capacity
+        hash_count = max(round(bits_per_name * math.log(2)), 1)
+        return cls(size, hash_count)
+
+    @classmethod
+    def from_names(
+        cls,
+        names: Iterable[str],
+        false_positive_rate: float,
+    ) -> 'BloomFilter':
+        names = set(names)
+        bloom_filter = cls.for_capacity(len(names), false_positive_rate)
+        for name in names:
+            bloom_filter.add(name)
+        return bloom_filter
+
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        with open(path, 'rb') as bloom_file:
+            size, hash_count, stamp = _HEADER.unpack(
+                bloom_file.read(_HEADER.size),
+            )
+            return cls(size, hash_count, bytearray(bloom_file.read()), stamp)
+
+    def dump(self, path: str) -> None:
+        """Atomically write filter to ``path``."""
+        with atomic_write(path) as tmp_path:
+            with open(tmp_path, 'wb') as bloom_file:
+                bloom_file.write(
+                    _HEADER.pack(self.size, self.hash_count, self.stamp),
+                )
+                bloom_file.write(self.bits)
+
+    def add(self, name: str) -> None:
+        for position in _positions(name, self.size, self.hash_count):
+            self.bits[position // _BYTE_SIZE] |= 1 << position % _BYTE_SIZE
+
+
+def _positions(name: str, size: int, hash_count: int) -> Iterator[int]:
+    # double hashing: i-th position is ``h1 + i * h2``
+    digest = hashlib.blake2b(name.encode(), digest_size=_DIGEST_SIZE).digest()
+    first_hash = int.from_bytes(digest[:_DIGEST_SIZE // 2], 'little')
+    second_hash = int.from_bytes(digest[_DIGEST_SIZE // 2:], 'little')
+    return (
+        (first_hash + index * second_hash) % size
+        for index in range(hash_count)
+    )
@@ -1,18 +1,70 @@
 import csv
 import os
 import sqlite3
+import time
 
+from contextlib import closing, suppress
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple, Union
+from itertools import chain, islice
+from types import MappingProxyType
+from typing import (  # noqa: WPS235
+    TYPE_CHECKING,
+    Container,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from typing_extensions import Final
 
 from location_extractor import src_dir
-from location_extractor.utils import remove_accents
+from location_extractor.bloom import BloomFilter
+from location_extractor.utils import atomic_write, remove_accents
+
+if TYPE_CHECKING:
+    from location_extractor.daemon import DaemonDBClient  # noqa: F401, WPS433
 
 StringOrIterableOfStrings = Union[str, Iterable[str]]
 COMMA: Final = ','
 LOWERCASE_COLUMN_SUFFIX: Final = '_lowercase'
+#: columns of ``locations`` table and of processed GeoLite2 CSV files
+LOCATIONS_COLUMNS: Final = (
+    'locale_code',
+    'continent_code',
+    'continent_name',
+    'country_iso_code',
+    'country_name',
+    'subdivision_name',
+    'city_name',
+    'is_in_european_union',
+)
+#: columns of ``names`` table rows, ``Entity`` subclasses use their suffix
+NAMES_COLUMNS: Final = (
+    'city_name',
+    'subdivision_name',
+    'country_name',
+    'country_iso_code',
+    'continent_name',
+)
+#: name columns of ``locations`` indexed in ``names`` table, mapped to the
+#: amount of trailing ``NAMES_COLUMNS`` describing their entities
+NAMES_TIERS: Final = MappingProxyType({
+    'continent_name': 1,
+    'country_iso_code': 3,
+    'country_name': 3,
+    'subdivision_name': 4,
+    'city_name': 5,
+})
+#: maximal amount of ``?`` parameters in a single query
+QUERY_PARAMETERS_LIMIT: Final = 500
 
 
 @dataclass(frozen=True, order=True)
@@ -27,15 +79,118 @@ class LocationDTO:
     is_in_european_union: bool
 
 
+@dataclass(frozen=True)
+class LocationsDiff:
+    """Amount of ``locations`` rows touched by an incremental update."""
+
+    added: int
+    removed: int
+
+
+@dataclass(frozen=True)
+class NameIndex:
+    """In-memory sets of lowercase location names, one per tier.
+
+    ``iso_codes`` maps lowercase ISO codes to names of their countries.
+    """
+
+    continents: FrozenSet[str]
+    countries: FrozenSet[str]
+    regions: FrozenSet[str]
+    cities: FrozenSet[str]
+    iso_codes: Mapping[str, str]
+
+    def __contains__(self, name: object) -> bool:
+        return (
+            name in self.continents
+            or name in self.countries
+            or name in self.regions
+            or name in self.cities
+        )
+
+    @classmethod
+    def merge(cls, indexes: Sequence['NameIndex']) -> 'NameIndex':
+        """Return union of ``indexes``, ISO codes of the first ones win."""
+        return cls(
+            continents=frozenset().union(
+                *(index.continents for index in indexes),
+            ),
+            countries=frozenset().union(
+                *(index.countries for index in indexes),
+            ),
+            regions=frozenset().union(*(index.regions for index in indexes)),
+            cities=frozenset().union(*(index.cities for index in indexes)),
+            iso_codes={
+                iso_code: country_name
+                for index in reversed(indexes)
+                for iso_code, country_name in index.iso_codes.items()
+            },
+        )
+
+
+class NameHits:
+    """``names`` table rows for probed names, grouped by name and tier."""
+
+    def __init__(self, names: Iterable[str], rows: Iterable[Tuple]) -> None:
+        self.names = set(names)
+        self._records: Dict[Tuple[str, str], List[Tuple]] = {}
+        for name, tier, *record in rows:
+            self._records.setdefault((name, tier), []).append(tuple(record))
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def update(self, other: 'NameHits') -> None:
+        self.names.update(other.names)
+        for key, records in other._records.items():  # noqa: WPS437
+            known_records = self._records.setdefault(key, [])
+            known_records.extend(
+                record for record in records if record not in known_records
+            )
+
+    def rows(self) -> Iterator[Tuple]:
+        """Yield rows in the form accepted by ``NameHits``."""
+        yield from (
+            (*name_and_tier, *record)
+            for name_and_tier, records in self._records.items()
+            for record in records
+        )
+
+    def records(self, name: str, tier: str) -> List[Tuple]:
+        """Return ``NAMES_COLUMNS`` values of ``tier`` entries for ``name``.
+
+        ``tier`` is one of ``NAMES_TIERS``.
+        """
+        return self._records.get((name, tier), [])
+
+
 # TODO: refactor ``DBClient`` to have lower complexity and amount of methods
-class DBClient:  # noqa: WPS214
-    def __init__(self) -> None:
-        self.dbpath = os.path.join(src_dir, 'data', 'data.db')
-        self.locations_path = os.path.join(
+class DBClient:  # noqa: WPS214, WPS230
+    #: minimal amount of seconds between checks of ``database_stamp``
+    stamp_check_interval: float = 1
+
+    def __init__(
+        self,
+        dbpath: Optional[str] = None,
+        locations_path: Optional[str] = None,
+        names_filter_false_positive_rate: float = 0.01,
+        locale: str = 'en',
+    ) -> None:
+        self.locale = locale
+        self.dbpath = dbpath or os.path.join(
+            src_dir,
+            'data',
+            f'data-{locale}.db',
+        )
+        self.names_filter_path = f'{os.path.splitext(self.dbpath)[0]}.bloom'
+        self.names_filter_false_positive_rate = (
+            names_filter_false_positive_rate
+        )
+        self.locations_path = locations_path or os.path.join(
             src_dir,
             'data',
             'GeoLite2-City-CSV_20200303',
-            'GeoLite2-City-Locations-en-processed.csv',
+            f'GeoLite2-City-Locations-{locale}-processed.csv',
         )
         self.index_columns = (
             'continent_name',
@@ -44,18 +199,16 @@ class DBClient:  # noqa: WPS214
             'subdivision_name',
             'city_name',
         )
-        self.default_columns = (
-            'locale_code',
-            'continent_code',
-            'continent_name',
-            'country_iso_code',
-            'country_name',
-            'subdivision_name',
-            'city_name',
-            'is_in_european_union',
-        )
+        self.default_columns = LOCATIONS_COLUMNS
         self.columns = COMMA.join(self.default_columns)
+        self._name_index: Optional[NameIndex] = None
+        self._names_filter: Optional[BloomFilter] = None
         self.populate_locations_table()
+        self._names_filter = self._names_filter or self._load_names_filter()
+        #: ``database_stamp`` of data ``name_index`` and ``names_filter``
+        #: were built from
+        self._stamp = self._names_filter.stamp
+        self._stamp_checked_at = time.monotonic()
 
     @property
     def connection(self) -> sqlite3.Connection:
@@ -63,18 +216,100 @@ class DBClient:  # noqa: WPS214
 
     def populate_locations_table(self) -> None:
         with self.connection as conn:
-            table_exists = conn.execute('''
-                SELECT
-                    name
-                FROM
-                    sqlite_master
-                WHERE
-                    type='table' AND name='locations';
-            ''').fetchone()
+            tables = {
+                row[0] for row in conn.execute('''
+                    SELECT
+                        name
+                    FROM
+                        sqlite_master
+                    WHERE
+                        type='table' AND name IN ('locations', 'names');
+                ''')
+            }
 
-            if not table_exists:
+            if 'locations' not in tables:
                 self._create_locations_table(conn)
                 self._populate_locations_table_with_data(conn)
+            if 'names' not in tables:
+                self._create_names_table(conn)
+                self._populate_names_table(conn)
+            if tables != {'locations', 'names'}:
+                self._bump_database_stamp(conn)
+
+        if tables != {'locations', 'names'}:
+            self._names_filter = self.build_names_filter()
+
+    @property
+    def database_stamp(self) -> int:
+        """Return version of data, bumped whenever the database changes.
+
+        The version is stored in the database as its ``user_version``, so
+        it is kept when the database is copied.
+        """
+        with closing(self.connection) as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    @property
+    def name_index(self) -> NameIndex:
+        """Return lazily built ``NameIndex`` of all names in the database."""
+        self._drop_stale_indexes()
+        if self._name_index is None:
+            self._name_index = NameIndex(
+                continents=self.fetch_distinct('continent_name'),
+                countries=self.fetch_distinct('country_name'),
+                regions=self.fetch_distinct('subdivision_name'),
+                cities=self.fetch_distinct('city_name'),
+                iso_codes=self.fetch_iso_codes(),
+            )
+        return self._name_index
+
+    @property
+    def names_filter(self) -> BloomFilter:
+        """Return ``BloomFilter`` of all lowercase names and ISO codes.
+
+        The filter is stored next to the database and loaded at startup,
+        or kept only in memory if it cannot be stored. It is reloaded if the
+        database was changed, e.g. by ``update_locations_table`` called in
+        another process, which is checked at most once per
+        ``stamp_check_interval`` seconds.
+        """
+        self._drop_stale_indexes()
+        if self._names_filter is None:
+            self._names_filter = self._load_names_filter()
+        return self._names_filter
+
+    def build_names_filter(self) -> BloomFilter:
+        stamp = self.database_stamp
+        with closing(self.connection) as conn:
+            names = conn.execute('''
+                SELECT DISTINCT
+                    name_lowercase
+                FROM
+                    names
+            ''')
+            names_filter = BloomFilter.from_names(
+                (row[0] for row in names),
+                self.names_filter_false_positive_rate,
+            )
+        names_filter.stamp = stamp
+        # e.g. an installation directory may be read-only
+        with suppress(OSError):
+            names_filter.dump(self.names_filter_path)
+        return names_filter
+
+    def check_stamp(self) -> int:
+        """Return ``database_stamp``, dropping indexes of older data.
+
+        ``name_index`` and ``names_filter`` are rebuilt on next access if
+        the database changed since they were built.
+        """
+        stamp = self.database_stamp
+        self._stamp_checked_at = time.monotonic()
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._name_index = None
+            self._names_filter = None
+        return stamp
 
     @staticmethod
     def parse_values(
@@ -105,6 +340,7 @@ class DBClient:  # noqa: WPS214
         columns: str,
         conn: sqlite3.Connection,
         value: str,
+        limit: int = -1,
     ) -> sqlite3.Cursor:
         return conn.execute(
             f'''
@@ -114,8 +350,9 @@ class DBClient:  # noqa: WPS214
                     locations
                 WHERE
                     {column_name}=?
+                LIMIT ?
             ''',
-            (value,),
+            (value, limit),
         )
 
     @staticmethod
@@ -154,6 +391,61 @@ class DBClient:  # noqa: WPS214
                 cursor = self.query_in(column_name, columns, conn, value)
             return cursor.fetchall()
 
+    def fetch_distinct(self, column_name: str) -> FrozenSet[str]:
+        """Return all lowercase values of ``column_name``.
+
+        ``column_name`` is one of ``NAMES_TIERS``.
+        """
+        with closing(self.connection) as conn:
+            cursor = conn.execute(
+                '''
+                    SELECT
+                        name_lowercase
+                    FROM
+                        names
+                    WHERE
+                        tier=?
+                ''',
+                (column_name,),
+            )
+            return frozenset(row[0] for row in cursor)
+
+    def fetch_iso_codes(self) -> Dict[str, str]:
+        """Return names of countries mapped by their lowercase ISO codes."""
+        with closing(self.connection) as conn:
+            return dict(conn.execute(
+                '''
+                    SELECT
+                        name_lowercase,
+                        country_name
+                    FROM
+                        names
+                    WHERE
+                        tier='country_iso_code'
+                ''',
+            ))
+
+    def lookup_names(self, names: Iterable[str]) -> NameHits:
+        """Find entries of all tiers for all ``names`` in ``names`` table."""
+        names = set(self.parse_values(names))
+        rows: List[Tuple] = []
+        with closing(self.connection) as conn:
+            for chunk in _chunks(list(names), QUERY_PARAMETERS_LIMIT):
+                rows.extend(conn.execute(
+                    f'''
+                        SELECT
+                            name_lowercase,
+                            tier,
+                            {COMMA.join(NAMES_COLUMNS)}
+                        FROM
+                            names
+                        WHERE
+                            name_lowercase IN ({COMMA.join('?' * len(chunk))})
+                    ''',
+                    chunk,
+                ))
+        return NameHits(names, rows)
+
     def fetch_all(
         self,
         column_name: str,
@@ -179,7 +471,7 @@ class DBClient:  # noqa: WPS214
             value = str(self.parse_values(value))
             columns = self.parse_columns(columns)
             column_name = f'{column_name}{LOWERCASE_COLUMN_SUFFIX}'
-            cursor = self.query(column_name, columns, conn, value)
+            cursor = self.query(column_name, columns, conn, value, limit=1)
             return cursor.fetchone()
 
     def fetch_one(self, column_name: str, value: str) -> Optional[LocationDTO]:
@@ -187,10 +479,41 @@ class DBClient:  # noqa: WPS214
             if isinstance(value, str):
                 value = remove_accents(value.lower())
             column_name = f'{column_name}{LOWERCASE_COLUMN_SUFFIX}'
-            cursor = self.query(column_name, self.columns, conn, value)
+            cursor = self.query(
+                column_name,
+                self.columns,
+                conn,
+                value,
+                limit=1,
+            )
             records: Tuple = cursor.fetchone()
             return LocationDTO(*records) if records else None
 
+    def update_locations_table(self, locations_path: str) -> LocationsDiff:
+        """Apply rows added or removed in ``locations_path`` to the database.
+
+        Rows are keyed by all of their values, so a changed row is applied
+        as a removal of its old version and an insertion of the new one.
+        The changes are written to a copy of the database which then
+        atomically replaces ``dbpath`` - connections opened before the swap
+        keep reading the previous data.
+        """
+        new_records = set(self._read_locations(locations_path))
+        with closing(self.connection) as conn:
+            current_records = set(
+                conn.execute(f'SELECT {self.columns} FROM locations'),
+            )
+        added = new_records - current_records
+        removed = current_records - new_records
+
+        if added or removed:
+            self._swap_database(added, removed)
+            self._name_index = None
+            self._names_filter = self.build_names_filter()
+            self._stamp = self._names_filter.stamp
+        self.locations_path = locations_path
+        return LocationsDiff(added=len(added), removed=len(removed))
+
     def _create_locations_table(self, connection: sqlite3.Connection) -> None:
         connection.execute(
             f'''
@@ -223,35 +546,269 @@ class DBClient:  # noqa: WPS214
                 ''',
             )
 
-    # TODO: refactor ``_populate_locations_table_with_data`` to have
-    # lower amount of variables
-    def _populate_locations_table_with_data(  # noqa: WPS210
+    @staticmethod
+    def _create_names_table(connection: sqlite3.Connection) -> None:
+        connection.execute(
+            f'''
+                CREATE TABLE names
+                (
+                    name_lowercase text,
+                    tier text,
+                    {COMMA.join(f'{column} text' for column in NAMES_COLUMNS)}
+                )
+            ''',
+        )
+        connection.execute(
+            'CREATE INDEX names_name_lowercase ON names(name_lowercase);',
+        )
+
+    @staticmethod
+    def _populate_names_table(
+        connection: sqlite3.Connection,
+        names_condition: str = 'IS NOT NULL',
+    ) -> None:
+        """Insert one row per distinct entity of each tier into ``names``.
+
+        Only names matching ``names_condition`` are inserted.
+        """
+        for tier, width in NAMES_TIERS.items():
+            blank_columns = ("''",) * (len(NAMES_COLUMNS) - width)
+            entity_columns = NAMES_COLUMNS[-width:]
+            connection.execute(
+                f'''
+                    INSERT INTO names
+                    SELECT DISTINCT
+                        {tier}{LOWERCASE_COLUMN_SUFFIX},
+                        '{tier}',
+                        {COMMA.join((*blank_columns, *entity_columns))}
+                    FROM
+                        locations
+                    WHERE
+                        {tier}{LOWERCASE_COLUMN_SUFFIX} != ''
+                        AND {tier}{LOWERCASE_COLUMN_SUFFIX} {names_condition}
+                ''',
+            )
+
+    @staticmethod
+    def _bump_database_stamp(connection: sqlite3.Connection) -> None:
+        stamp = connection.execute('PRAGMA user_version').fetchone()[0]
+        # ``PRAGMA`` does not accept parameters
+        connection.execute(f'PRAGMA user_version = {stamp + 1:d}')
+
+    def _load_names_filter(self) -> BloomFilter:
+        if os.path.exists(self.names_filter_path):
+            names_filter = BloomFilter.load(self.names_filter_path)
+            if names_filter.stamp == self.database_stamp:
+                return names_filter
+        return self.build_names_filter()
+
+    def _drop_stale_indexes(self) -> None:
+        checked_at = time.monotonic()
+        if checked_at - self._stamp_checked_at >= self.stamp_check_interval:
+            self.check_stamp()
+
+    def _swap_database(
+        self,
+        added: Set[Tuple],
+        removed: Set[Tuple],
+    ) -> None:
+        with atomic_write(self.dbpath) as updated_dbpath:
+            self._write_updated_database(updated_dbpath, added, removed)
+
+    def _write_updated_database(
+        self,
+        updated_dbpath: str,
+        added: Set[Tuple],
+        removed: Set[Tuple],
+    ) -> None:
+        source = self.connection
+        target = sqlite3.connect(updated_dbpath)
+        with closing(source):
+            with closing(target):
+                source.backup(target)
+                with target:
+                    self._delete_locations(target, removed)
+                    self._insert_locations(target, added)
+                    self._update_names_table(target, added | removed)
+                    self._bump_database_stamp(target)
+
+    def _delete_locations(
         self,
         connection: sqlite3.Connection,
+        records: Iterable[Tuple],
     ) -> None:
-        locations_data = []
-        with open(self.locations_path, 'r') as locations_file:
-            reader = csv.reader(locations_file, delimiter=COMMA)
-            columns = list(next(reader))
-            columns = [
-                *columns,
-                *(
-                    f'{column_name}{LOWERCASE_COLUMN_SUFFIX}'
-                    for column_name in columns[:-1]
-                ),
-            ]
-            for row in reader:
-                str_values = [value or '' for value in row[:7]]
-                locations_data.append((
-                    *str_values,
-                    row[7] == 'True',  # is_in_european_union,
-                    *(value.lower() for value in str_values),
-                ))
+        # ``city_name_lowercase`` is compared first to make use of its index
+        conditions = ' AND '.join(
+            f'{column_name}=?' for column_name in self.default_columns
+        )
+        # only column names are formatted into the query
+        connection.executemany(
+            f'''
+                DELETE FROM
+                    locations
+                WHERE
+                    city_name{LOWERCASE_COLUMN_SUFFIX}=? AND {conditions}
+            ''',  # noqa: S608
+            (
+                (record[6].lower(), *record)
+                for record in records
+            ),
+        )
 
+    @staticmethod
+    def _insert_locations(
+        connection: sqlite3.Connection,
+        records: Iterable[Tuple],
+    ) -> None:
         connection.executemany(
             '''
                 INSERT INTO locations
                 VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
             ''',
-            locations_data,
+            (
+                (*record, *(value.lower() for value in record[:7]))
+                for record in records
+            ),
         )
+
+    def _update_names_table(
+        self,
+        connection: sqlite3.Connection,
+        records: Set[Tuple],
+    ) -> None:
+        """Rebuild ``names`` entries of all names used in ``records``."""
+        connection.execute(
+            'CREATE TEMP TABLE affected_names (name text PRIMARY KEY)',
+        )
+        connection.executemany(
+            'INSERT OR IGNORE INTO affected_names VALUES (?)',
+            (
+                (value.lower(),)
+                for record in records
+                for value in record[2:7]
+            ),
+        )
+        affected_names = 'IN (SELECT name FROM affected_names)'
+        connection.execute(
+            f'''
+            DELETE FROM names WHERE name_lowercase {affected_names}
+            ''',  # noqa: S608
+        )
+        self._populate_names_table(connection, affected_names)
+        connection.execute('DROP TABLE affected_names')
+
+    @staticmethod
+    def _read_locations(locations_path: str) -> Iterator[Tuple]:
+        with open(locations_path, 'r') as locations_file:
+            reader = csv.reader(locations_file, delimiter=COMMA)
+            next(reader)  # skip header
+            yield from (
+                (
+                    *(value or '' for value in row[:7]),
+                    row[7] == 'True',  # is_in_european_union
+                )
+                for row in reader
+            )
+
+    def _populate_locations_table_with_data(
+        self,
+        connection: sqlite3.Connection,
+    ) -> None:
+        self._insert_locations(
+            connection,
+            self._read_locations(self.locations_path),
+        )
+
+
+class _AnyOf:
+    def __init__(self, containers: Iterable[Container[str]]) -> None:
+        self.containers = tuple(containers)
+
+    def __contains__(self, name: object) -> bool:
+        return any(name in container for container in self.containers)
+
+
+class ShardedDBClient:  # noqa: WPS214
+    """Gazetteer split into ``DBClient`` shards, one per locale.
+
+    Every shard has its own database and names filter files, so only
+    locales actually used have to be loaded. Provides lookup methods of
+    ``DBClient`` with results of all shards merged.
+    """
+
+    # names are normalized exactly like ``DBClient`` does
+    parse_values = staticmethod(DBClient.parse_values)  # noqa: WPS421
+
+    def __init__(self, shards: Sequence[DBClient]) -> None:
+        self.shards = shards
+        self._name_index: Optional[NameIndex] = None
+        self._shard_indexes: List[NameIndex] = []
+
+    @classmethod
+    def for_locales(cls, locales: Iterable[str]) -> 'ShardedDBClient':
+        return cls([DBClient(locale=locale) for locale in locales])
+
+    @property
+    def name_index(self) -> NameIndex:
+        """Return ``NameIndex`` merged from shards, rebuilt if any changed."""
+        indexes = [shard.name_index for shard in self.shards]
+        is_stale = any(
+            index is not known_index
+            for index, known_index in zip(indexes, self._shard_indexes)
+        )
+        if self._name_index is None or is_stale:
+            self._shard_indexes = indexes
+            # codes of the first shards take precedence
+            self._name_index = NameIndex.merge(indexes)
+        return self._name_index
+
+    @property
+    def names_filter(self) -> Container[str]:
+        return _AnyOf(shard.names_filter for shard in self.shards)
+
+    def lookup_names(self, names: Iterable[str]) -> NameHits:
+        names = list(names)
+        hits = NameHits(self.parse_values(names), [])
+        for shard in self.shards:
+            hits.update(shard.lookup_names(names))
+        return hits
+
+    def fetch_all_raw(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+        columns: Optional[StringOrIterableOfStrings] = None,
+    ) -> List[Tuple]:
+        return list(dict.fromkeys(chain.from_iterable(
+            shard.fetch_all_raw(column_name, value, columns)
+            for shard in self.shards
+        )))
+
+    def fetch_all(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+    ) -> List[LocationDTO]:
+        return list(dict.fromkeys(chain.from_iterable(
+            shard.fetch_all(column_name, value) for shard in self.shards
+        )))
+
+    def fetch_one_raw(
+        self,
+        column_name: str,
+        value: str,
+        columns: Optional[Union[StringOrIterableOfStrings]] = None,
+    ) -> Optional[Tuple]:
+        for shard in self.shards:
+            record = shard.fetch_one_raw(column_name, value, columns)
+            if record is not None:
+                return record
+        return None
+
+
+AnyDBClient = Union[DBClient, ShardedDBClient, 'DaemonDBClient']
+
+
+def _chunks(values: List[str], size: int) -> Iterator[List[str]]:
+    remaining = iter(values)
+    return iter(lambda: list(islice(remaining, size)), [])
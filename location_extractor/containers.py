@@ -1,16 +1,44 @@
 import abc
-
-from dataclasses import dataclass
-from typing import List, Optional, Type, TypeVar
-
-from location_extractor.clients import LocationDTO
+import operator
+
+from dataclasses import dataclass, field
+from typing import (  # noqa: WPS235
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from location_extractor.clients import LocationDTO, NameHits
 
 GenericEntity = TypeVar('GenericEntity', bound='Entity')
+SortKey = Tuple[str, ...]
 
 
-class Entity(abc.ABC):
+class Entity(abc.ABC):  # noqa: WPS214
     """Container for domain specific entities."""
 
+    #: ``locations`` columns needed to create instance using ``from_record``
+    columns: ClassVar[Tuple[str, ...]]
+
+    def __lt__(self, other: 'Entity') -> bool:
+        return self.sort_key < other.sort_key
+
+    @property
+    @abc.abstractmethod
+    def sort_key(self) -> SortKey:
+        """Return flat tuple of names ``Entity`` instances are ordered by."""
+
+    @property
+    @abc.abstractmethod
+    def record(self) -> Tuple[str, ...]:
+        """Return values of ``columns``, inverse of ``from_record``."""
+
     @classmethod
     @abc.abstractmethod
     def from_dto(cls: Type[GenericEntity], dto: LocationDTO) -> GenericEntity:
@@ -24,6 +52,22 @@ class Entity(abc.ABC):
     ) -> List[GenericEntity]:
         """Create ``Entity`` instances from ``LocationDTO`` instances."""
 
+    @classmethod
+    @abc.abstractmethod
+    def from_record(
+        cls: Type[GenericEntity],
+        record: Sequence[str],
+    ) -> GenericEntity:
+        """Create ``Entity`` instance from values of ``columns``."""
+
+    @classmethod
+    def from_records(
+        cls: Type[GenericEntity],
+        records: List[Tuple],
+    ) -> List[GenericEntity]:
+        """Create ``Entity`` instances from values of ``columns``."""
+        return [cls.from_record(record) for record in records]
+
     @classmethod
     def many_to_string(
         cls: Type[GenericEntity],
@@ -37,8 +81,15 @@ class Entity(abc.ABC):
 class Continent(Entity):
     name: str
 
-    def __lt__(self, other):
-        return self.name < other.name
+    columns: ClassVar[Tuple[str, ...]] = ('continent_name',)
+
+    @property
+    def sort_key(self) -> SortKey:
+        return (self.name,)
+
+    @property
+    def record(self) -> Tuple[str, ...]:
+        return (self.name,)
 
     def __str__(self) -> str:
         return self.name
@@ -51,6 +102,10 @@ class Continent(Entity):
     def from_dtos(cls, dtos: List[LocationDTO]) -> List['Continent']:
         return [cls.from_dto(dto) for dto in dtos]
 
+    @classmethod
+    def from_record(cls, record: Sequence[str]) -> 'Continent':
+        return cls(name=record[0])
+
 
 @dataclass(frozen=True, eq=True)
 class Country(Entity):
@@ -58,8 +113,19 @@ class Country(Entity):
     iso_code: str
     continent: Continent
 
-    def __lt__(self, other):
-        return (self.continent, self.name) < (other.continent, other.name)
+    columns: ClassVar[Tuple[str, ...]] = (
+        'country_name',
+        'country_iso_code',
+        'continent_name',
+    )
+
+    @property
+    def sort_key(self) -> SortKey:
+        return (self.continent.name, self.name)
+
+    @property
+    def record(self) -> Tuple[str, ...]:
+        return (self.name, self.iso_code, self.continent.name)
 
     def __str__(self) -> str:
         return f'{self.name}, {self.continent}'
@@ -76,14 +142,30 @@ class Country(Entity):
     def from_dtos(cls, dtos: List[LocationDTO]) -> List['Country']:
         return [cls.from_dto(dto) for dto in dtos]
 
+    @classmethod
+    def from_record(cls, record: Sequence[str]) -> 'Country':
+        name, iso_code, continent_name = record
+        return cls(
+            name=name,
+            iso_code=iso_code,
+            continent=Continent(name=continent_name),
+        )
+
 
 @dataclass(frozen=True, eq=True)
 class Region(Entity):
     name: str
     country: Country
 
-    def __lt__(self, other):
-        return (self.country, self.name) < (other.country, other.name)
+    columns: ClassVar[Tuple[str, ...]] = ('subdivision_name', *Country.columns)
+
+    @property
+    def sort_key(self) -> SortKey:
+        return (*self.country.sort_key, self.name)
+
+    @property
+    def record(self) -> Tuple[str, ...]:
+        return (self.name, *self.country.record)
 
     def __str__(self) -> str:
         return f'{self.name}, {self.country}'
@@ -99,6 +181,10 @@ class Region(Entity):
     def from_dtos(cls, dtos: List[LocationDTO]) -> List['Region']:
         return [cls.from_dto(dto) for dto in dtos]
 
+    @classmethod
+    def from_record(cls, record: Sequence[str]) -> 'Region':
+        return cls(name=record[0], country=Country.from_record(record[1:]))
+
 
 @dataclass(frozen=True, eq=True)
 class City(Entity):
@@ -106,11 +192,18 @@ class City(Entity):
     region: Optional[Region]
     country: Country
 
-    def __lt__(self, other):
-        return (
-            (self.country, self.region, self.name)
-            < (other.country, other.region, other.name)
-        )
+    columns: ClassVar[Tuple[str, ...]] = ('city_name', *Region.columns)
+
+    @property
+    def sort_key(self) -> SortKey:
+        region_name = self.region.name if self.region else ''
+        return (*self.country.sort_key, region_name, self.name)
+
+    @property
+    def record(self) -> Tuple[str, ...]:
+        if self.region is None:
+            return (self.name, '', *self.country.record)
+        return (self.name, *self.region.record)
 
     def __str__(self) -> str:
         return f'{self.name}, {self.region}'
@@ -126,3 +219,103 @@ class City(Entity):
     @classmethod
     def from_dtos(cls, dtos: List[LocationDTO]) -> List['City']:
         return [cls.from_dto(dto) for dto in dtos]
+
+    @classmethod
+    def from_record(cls, record: Sequence[str]) -> 'City':
+        region = Region.from_record(record[1:])
+        return cls(name=record[0], region=region, country=region.country)
+
+
+@dataclass
+class CapStats:
+    """Counters of names checked against a cap of entities per name."""
+
+    checked: int = 0
+    capped: int = 0
+    #: entities not considered because of the cap
+    dropped: int = 0
+
+
+Locations = Tuple[
+    List[Continent],
+    List[Country],
+    List[Region],
+    List[City],
+]
+StrLocations = Tuple[
+    List[str],
+    List[str],
+    List[str],
+    List[str],
+]
+_sort_key = operator.attrgetter('sort_key')
+
+
+@dataclass
+class LocationsResult:
+    """Unsorted locations with lazily computed sorted and string views.
+
+    Unpacks like the tuple returned by ``Extractor.find_locations``.
+    ``partial`` is set if some locations may be missing, e.g. because of
+    exceeded time budget.
+    """
+
+    continents: List[Continent]
+    countries: List[Country]
+    regions: List[Region]
+    cities: List[City]
+    partial: bool = False
+    _sorted: Optional[Locations] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _strings: Optional[StrLocations] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def __iter__(self) -> Iterator[List]:
+        yield from self.to_tuple()
+
+    def to_tuple(self) -> Locations:
+        return self.continents, self.countries, self.regions, self.cities
+
+    def to_sorted(self) -> Locations:
+        if self._sorted is None:
+            # dataclass fields declared with ``field`` caching the views
+            self._sorted = (  # noqa: WPS601
+                sorted(self.continents, key=_sort_key),
+                sorted(self.countries, key=_sort_key),
+                sorted(self.regions, key=_sort_key),
+                sorted(self.cities, key=_sort_key),
+            )
+        return self._sorted
+
+    def to_strings(self) -> StrLocations:
+        """Return sorted string representations of all locations."""
+        if self._strings is None:
+            continents, countries, regions, cities = self.to_sorted()
+            self._strings = (  # noqa: WPS601
+                Continent.many_to_string(continents),
+                Country.many_to_string(countries),
+                Region.many_to_string(regions),
+                City.many_to_string(cities),
+            )
+        return self._strings
+
+
+@dataclass
+class DocumentState:
+    """Places found in paragraphs of a document and names looked up for them.
+
+    Returned by ``Extractor.extract_locations_incremental`` to be passed
+    back with the next version of the document.
+    """
+
+    #: places found in each distinct paragraph, in order of paragraphs
+    paragraphs: Dict[str, List[str]]
+    hits: NameHits
@@ -0,0 +1,438 @@
+"""Local lookup daemon sharing one warm gazetteer between processes.
+
+``LookupServer`` listens on a Unix socket and answers lookups with its
+``DBClient``, keeping names looked up by any client in a shared cache.
+``DaemonDBClient`` provides ``DBClient`` lookup methods backed by the
+daemon, so it can be passed to ``Extractor``. Messages are JSON documents
+prefixed with their length.
+
+Run with ``python -m location_extractor.daemon SOCKET_PATH [LOCALE]``.
+"""
+import base64
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+
+from dataclasses import asdict, dataclass
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, cast
+
+from typing_extensions import Final
+
+from location_extractor.bloom import BloomFilter
+from location_extractor.clients import (
+    DBClient,
+    LocationDTO,
+    NameHits,
+    NameIndex,
+    StringOrIterableOfStrings,
+)
+
+_LENGTH: Final = struct.Struct('>I')
+
+
+class DaemonError(Exception):
+    """Lookup failed on the daemon side or the daemon is already running."""
+
+
+@dataclass
+class CacheStats:
+    """Counters of names looked up in ``LookupServer`` cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+def send_message(connection: socket.socket, message: object) -> None:
+    payload = json.dumps(message).encode()
+    connection.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def receive_message(
+    connection: socket.socket,
+) -> Optional[Dict[str, object]]:
+    """Return received message or ``None`` if connection was closed."""
+    header = _receive_exactly(connection, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    payload = _receive_exactly(connection, length)
+    return None if payload is None else json.loads(payload)
+
+
+def _exchange(
+    connection: socket.socket,
+    message: object,
+) -> Optional[Dict[str, object]]:
+    send_message(connection, message)
+    return receive_message(connection)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = connection.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class _LookupHandler(socketserver.BaseRequestHandler):
+    server: 'LookupServer'
+
+    # name required by ``BaseRequestHandler``
+    def handle(self) -> None:  # noqa: WPS110
+        while True:  # noqa: WPS457
+            request = receive_message(self.request)
+            if request is None:
+                return
+            try:
+                response = self.server.dispatch(
+                    cast(str, request['method']),
+                    cast(List[object], request['params']),
+                )
+            except Exception as error:  # noqa: B902
+                response = {'error': f'{type(error).__name__}: {error}'}
+            send_message(self.request, response)
+
+
+class LookupServer(  # noqa: WPS214
+    socketserver.ThreadingUnixStreamServer,
+):
+    """Serve lookups of ``dbclient`` on Unix socket at ``path``.
+
+    Rows of up to ``cache_size`` names are cached and shared by all
+    clients, the oldest names are evicted first. The cache is cleared when
+    ``database_stamp`` of ``dbclient`` changes.
+    """
+
+    daemon_threads = True
+    methods: Final = frozenset((
+        'lookup_names',
+        'fetch_all_raw',
+        'fetch_all',
+        'fetch_one_raw',
+        'name_index',
+        'names_filter',
+        'cache_stats',
+    ))
+
+    def __init__(
+        self,
+        path: str,
+        dbclient: Optional[DBClient] = None,
+        cache_size: int = 100000,
+    ) -> None:
+        self.dbclient = dbclient or DBClient()
+        self.cache_size = cache_size
+        self.cache: Dict[str, List[Tuple]] = {}
+        self.cache_stats = CacheStats()
+        #: ``database_stamp`` of data in ``cache``
+        self.stamp = self.dbclient.check_stamp()
+        self._cache_lock = threading.Lock()
+        if os.path.exists(path):
+            _remove_stale_socket(path)
+        super().__init__(path, _LookupHandler)
+
+    def dispatch(
+        self,
+        method: str,
+        arguments: Sequence[object],
+    ) -> Dict[str, object]:
+        """Return response with result of ``method`` and its data stamp.
+
+        The stamp is read before ``method`` is called, so the result is
+        never older than the stamp.
+
+        Raises:
+            ValueError: if ``method`` is not one of ``methods``.
+        """
+        if method not in self.methods:
+            raise ValueError(f'unknown method {method!r}')
+        stamp = self._drop_stale_cache()
+        return {
+            'result': getattr(self, f'_{method}')(*arguments),
+            'stamp': stamp,
+        }
+
+    def _drop_stale_cache(self) -> int:
+        stamp = self.dbclient.check_stamp()
+        with self._cache_lock:
+            if stamp != self.stamp:
+                self.stamp = stamp
+                self.cache.clear()
+        return stamp
+
+    def _lookup_names(self, names: List[str]) -> Tuple[List[str], List]:
+        names = list(dict.fromkeys(self.dbclient.parse_values(names)))
+        with self._cache_lock:
+            stamp = self.stamp
+            rows = {
+                name: self.cache[name] for name in names if name in self.cache
+            }
+            self.cache_stats.hits += len(rows)
+            self.cache_stats.misses += len(names) - len(rows)
+        missing = [name for name in names if name not in rows]
+        if missing:
+            rows.update(self._cache_rows(
+                missing,
+                self.dbclient.lookup_names(missing),
+                stamp,
+            ))
+        return names, list(chain.from_iterable(
+            rows[name] for name in names
+        ))
+
+    def _cache_rows(
+        self,
+        names: List[str],
+        hits: NameHits,
+        stamp: int,
+    ) -> Dict[str, List[Tuple]]:
+        rows: Dict[str, List[Tuple]] = {name: [] for name in names}
+        for row in hits.rows():
+            rows[row[0]].append(row)
+        with self._cache_lock:
+            # rows looked up before the cache was cleared may be stale
+            if stamp == self.stamp:
+                self.cache.update(rows)
+            while len(self.cache) > self.cache_size:
+                del self.cache[next(iter(self.cache))]  # noqa: WPS420
+        return rows
+
+    def _fetch_all_raw(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+        columns: Optional[StringOrIterableOfStrings] = None,
+    ) -> List[Tuple]:
+        return self.dbclient.fetch_all_raw(column_name, value, columns)
+
+    def _fetch_all(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+    ) -> List[Tuple]:
+        return [
+            tuple(asdict(location).values())
+            for location in self.dbclient.fetch_all(column_name, value)
+        ]
+
+    def _fetch_one_raw(
+        self,
+        column_name: str,
+        value: str,
+        columns: Optional[StringOrIterableOfStrings] = None,
+    ) -> Optional[Tuple]:
+        return self.dbclient.fetch_one_raw(column_name, value, columns)
+
+    def _name_index(self) -> Dict[str, object]:
+        name_index = self.dbclient.name_index
+        return {
+            'continents': sorted(name_index.continents),
+            'countries': sorted(name_index.countries),
+            'regions': sorted(name_index.regions),
+            'cities': sorted(name_index.cities),
+            'iso_codes': dict(name_index.iso_codes),
+        }
+
+    def _names_filter(self) -> Dict[str, object]:
+        names_filter = self.dbclient.names_filter
+        return {
+            'size': names_filter.size,
+            'hash_count': names_filter.hash_count,
+            'bits': base64.b64encode(names_filter.bits).decode(),
+        }
+
+    def _cache_stats(self) -> Dict[str, int]:
+        return asdict(self.cache_stats)
+
+
+class DaemonDBClient:  # noqa: WPS214
+    """``DBClient`` lookup methods answered by ``LookupServer`` at ``path``.
+
+    ``name_index`` and ``names_filter`` are transferred once and kept in
+    memory, as they are checked for every place, until a response of the
+    daemon carries a newer ``database_stamp``. The connection is opened
+    lazily, reopened in forked processes and shared by threads one call at
+    a time.
+    """
+
+    # names are normalized exactly like ``DBClient`` does
+    parse_values = staticmethod(DBClient.parse_values)  # noqa: WPS421
+
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._connection: Optional[socket.socket] = None
+        self._connection_pid: Optional[int] = None
+        self._name_index: Optional[NameIndex] = None
+        self._names_filter: Optional[BloomFilter] = None
+        #: ``database_stamp`` of data ``name_index`` and ``names_filter``
+        #: were transferred with
+        self._stamp: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def call(self, method: str, *arguments: object) -> object:
+        with self._lock:
+            connection = self._connect()
+            try:
+                response = _exchange(
+                    connection,
+                    {'method': method, 'params': arguments},
+                )
+            # interrupted exchange leaves a partial message in the socket
+            except BaseException:  # noqa: WPS424
+                self.close()
+                raise
+            if response is None:
+                self.close()
+                raise DaemonError('connection closed by the daemon')
+        error = response.get('error')
+        if error is not None:
+            raise DaemonError(error)
+        self._drop_stale_indexes(cast(int, response['stamp']))
+        return response['result']
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+
+    @property
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            name_index = cast(
+                Dict[str, Iterable[str]],
+                self.call('name_index'),
+            )
+            self._name_index = NameIndex(
+                continents=frozenset(name_index['continents']),
+                countries=frozenset(name_index['countries']),
+                regions=frozenset(name_index['regions']),
+                cities=frozenset(name_index['cities']),
+                iso_codes=cast(Dict[str, str], name_index['iso_codes']),
+            )
+        return self._name_index
+
+    @property
+    def names_filter(self) -> BloomFilter:
+        if self._names_filter is None:
+            names_filter = cast(Dict[str, int], self.call('names_filter'))
+            bits = cast(str, names_filter['bits'])
+            self._names_filter = BloomFilter(
+                names_filter['size'],
+                names_filter['hash_count'],
+                bytearray(base64.b64decode(bits)),
+            )
+        return self._names_filter
+
+    def lookup_names(self, names: Iterable[str]) -> NameHits:
+        probed, rows = cast(
+            Tuple[List[str], List[List[str]]],
+            self.call('lookup_names', list(names)),
+        )
+        return NameHits(probed, map(tuple, rows))
+
+    def fetch_all_raw(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+        columns: Optional[StringOrIterableOfStrings] = None,
+    ) -> List[Tuple]:
+        records = self.call(
+            'fetch_all_raw',
+            column_name,
+            _jsonable(value),
+            _jsonable(columns),
+        )
+        return [tuple(record) for record in cast(List[List[str]], records)]
+
+    def fetch_all(
+        self,
+        column_name: str,
+        value: StringOrIterableOfStrings,
+    ) -> List[LocationDTO]:
+        records = self.call('fetch_all', column_name, _jsonable(value))
+        return [
+            LocationDTO(*record)
+            for record in cast(List[list], records)
+        ]
+
+    def fetch_one_raw(
+        self,
+        column_name: str,
+        value: str,
+        columns: Optional[StringOrIterableOfStrings] = None,
+    ) -> Optional[Tuple]:
+        record = self.call(
+            'fetch_one_raw',
+            column_name,
+            value,
+            _jsonable(columns),
+        )
+        if record is None:
+            return None
+        return tuple(cast(List[str], record))
+
+    def cache_stats(self) -> CacheStats:
+        return CacheStats(**cast(Dict[str, int], self.call('cache_stats')))
+
+    def _drop_stale_indexes(self, stamp: int) -> None:
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._name_index = None
+            self._names_filter = None
+
+    def _connect(self) -> socket.socket:
+        if self._connection is None or self._connection_pid != os.getpid():
+            # sockets inherited from the parent process must not be shared
+            self._connection = socket.socket(socket.AF_UNIX)
+            self._connection.settimeout(self.timeout)
+            self._connection.connect(self.path)
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove socket at ``path`` unless a daemon is listening on it.
+
+    Raises:
+        DaemonError: if ``path`` is not a socket or a daemon is listening
+            at it.
+    """
+    if not stat.S_ISSOCK(os.lstat(path).st_mode):
+        raise DaemonError(f'{path} is not a socket')
+    with socket.socket(socket.AF_UNIX) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            os.remove(path)
+            return
+    raise DaemonError(f'daemon is already listening at {path}')
+
+
+def _jsonable(
+    value: Optional[StringOrIterableOfStrings],
+) -> Optional[StringOrIterableOfStrings]:
+    if value is None or isinstance(value, str):
+        return value
+    return list(value)
+
+
+def main() -> None:
+    path = sys.argv[1]
+    locale = sys.argv[2] if len(sys.argv) > 2 else 'en'
+    with LookupServer(path, DBClient(locale=locale)) as server:
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
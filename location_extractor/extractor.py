@@ -1,29 +1,95 @@
+import functools
 import re
+import time
 
-from typing import Generator, Iterable, List, Optional, Set, Tuple, Union
+from contextlib import nullcontext
+from itertools import chain
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from typing_extensions import Final
 
-from location_extractor.clients import DBClient, LocationDTO
-from location_extractor.containers import City, Continent, Country, Region
+from location_extractor.bloom import FilterStats
+from location_extractor.clients import (
+    AnyDBClient,
+    DBClient,
+    LocationDTO,
+    NameHits,
+    ShardedDBClient,
+)
+from location_extractor.containers import (
+    CapStats,
+    City,
+    Continent,
+    Country,
+    DocumentState,
+    GenericEntity,
+    Locations,
+    LocationsResult,
+    Region,
+    StrLocations,
+)
+from location_extractor.memory import (
+    MemoryReport,
+    components_sizes,
+    memory_usage,
+)
 from location_extractor.named_entity_recognition.ner import NERExtractor
+from location_extractor.named_entity_recognition.tokenizers import (
+    DEFAULT_WINDOW_SIZE,
+    iter_windows,
+)
+from location_extractor.profiling import CallReport, Profiler
+from location_extractor.serialization import CompactLocations, pack
 from location_extractor.utils import remove_accents
 
-_Locations = Tuple[
-    List[Continent],
-    List[Country],
-    List[Region],
-    List[City],
-]
-_MaybeStrLocations = Union[
-    _Locations,
-    Tuple[List[str], List[str], List[str], List[str]],  # noqa: WPS221
-]
+_MaybeStrLocations = Union[Locations, StrLocations]
 EMPTY_STRING: Final = ''
 
 
+def _never() -> bool:
+    return False
+
+
+def _always() -> bool:
+    return True
+
+
+def _context_rank(
+    context: Tuple[Set[Tuple], Set[Tuple], Set[str]],
+    record: Tuple,
+) -> Tuple[int, Tuple]:
+    """Rank ``City`` record by the narrowest of ``context`` tiers it is in.
+
+    ``context`` holds records of regions and countries and names of
+    continents, ties are broken by record values.
+    """
+    regions_records, countries_records, continents_names = context
+    # ``City.columns`` end with ``Region`` and ``Country`` ones
+    in_context = (
+        record[1:] in regions_records,
+        record[2:] in countries_records,
+        record[-1] in continents_names,
+    )
+    if any(in_context):
+        return (in_context.index(True), record)
+    return (len(in_context), record)
+
+
 # TODO: refactor ``Extractor`` to have less method and lower complexity
-class Extractor:  # noqa: WPS214
+class Extractor:  # noqa: WPS214, WPS230
     sublocation_pattern = re.compile(
         r'\s*(west|south|north|east)(ern)?\s*',
         re.IGNORECASE,
@@ -32,14 +98,62 @@ class Extractor:  # noqa: WPS214
         r'(^|\s)(the)(\s|$)',
         flags=re.IGNORECASE,
     )
+    segments_separator_pattern = re.compile(r'\s*[,;|]\s*')
+    paragraphs_separator_pattern = re.compile(r'\n\s*\n')
+    short_text_max_words = 6
+    #: words allowed between location names in short texts
+    short_text_connectors = frozenset((
+        'and',
+        'at',
+        'from',
+        'in',
+        'near',
+        'of',
+        'to',
+    ))
+    #: parts of ``extract_locations_within`` budget after which named entity
+    #: recognition is skipped, cities are capped to ``budget_max_candidates``
+    #: per name and resolution of regions and cities is skipped
+    budget_ner_share = 0.5
+    budget_candidates_share = 0.6
+    budget_tiers_share = 0.8
+    budget_max_candidates = 20
+    #: maximal amount of cities considered for a single name, ``None`` means
+    #: no limit, see ``prune_cities``
+    max_cities_per_name: Optional[int] = None
+
+    def __init__(  # noqa: WPS211
+        self,
+        dbclient: Optional[AnyDBClient] = None,
+        filter_candidates: bool = True,
+        tokenizer: str = 'treebank',
+        locales: Sequence[str] = ('en',),
+        profiler: Optional[Profiler] = None,
+        compiled_models: bool = False,
+    ) -> None:
+        """Create extractor looking locations up in ``dbclient``.
 
-    def __init__(self) -> None:
-        self.extractor = NERExtractor()
-        self.dbclient = DBClient()
+        If ``dbclient`` is not given, gazetteers of ``locales`` are loaded.
+        If ``profiler`` is given, slow ``extract_locations`` calls are
+        profiled, see ``location_extractor.profiling``. ``compiled_models``
+        are passed to ``NERExtractor``.
+        """
+        self.extractor = NERExtractor(tokenizer, compiled_models)
+        self.dbclient = dbclient or self.create_dbclient(locales)
         self.acronyms_mapping = {
             'UK': 'United Kingdom',
             'USA': 'United States',
         }
+        self.filter_candidates = filter_candidates
+        self.candidates_stats = FilterStats()
+        self.cities_stats = CapStats()
+        self.profiler = profiler
+
+    @staticmethod
+    def create_dbclient(locales: Sequence[str]) -> AnyDBClient:
+        if len(locales) == 1:
+            return DBClient(locale=locales[0])
+        return ShardedDBClient.for_locales(locales)
 
     def places_by_name(
         self,
@@ -54,13 +168,87 @@ class Extractor:  # noqa: WPS214
     def regions_for_name(self, region_name: str) -> List[LocationDTO]:
         return self.places_by_name(region_name, 'subdivision_name')
 
-    def get_continents(self, places) -> Tuple[List[Continent], Set[str]]:
+    def entities_by_name(
+        self,
+        entity_class: Type[GenericEntity],
+        place_name: str,
+        column_name: str,
+        hits: Optional[NameHits] = None,
+    ) -> List[GenericEntity]:
+        """Return entities named ``place_name``.
+
+        Entities are taken from ``hits`` if ``place_name`` was probed by
+        ``lookup_places``. Otherwise only ``entity_class.columns`` are
+        fetched, so there is one row per distinct entity instead of one per
+        matching location.
+        """
+        return entity_class.from_records(self.records_by_name(
+            entity_class,
+            place_name,
+            column_name,
+            hits,
+        ))
+
+    def records_by_name(
+        self,
+        entity_class: Type[GenericEntity],
+        place_name: str,
+        column_name: str,
+        hits: Optional[NameHits] = None,
+    ) -> List[Tuple]:
+        """Return ``entity_class.columns`` values of entities named so."""
+        name = str(self.dbclient.parse_values(place_name))
+        if hits is not None and name in hits:
+            width = len(entity_class.columns)
+            return [
+                record[-width:] for record in hits.records(name, column_name)
+            ]
+        return self.dbclient.fetch_all_raw(
+            column_name,
+            place_name,
+            entity_class.columns,
+        )
+
+    def lookup_places(
+        self,
+        places: Iterable[str],
+        hits: Optional[NameHits] = None,
+    ) -> NameHits:
+        """Find entries of all tiers for ``places`` with a single lookup.
+
+        Besides ``places`` names they may be resolved to by
+        ``resolve_acronym`` are looked up as well. If ``hits`` are given,
+        only names not probed for them are looked up and ``hits`` are
+        updated and returned.
+        """
+        names: List[str] = []
+        for place in places:
+            names.extend((place, self.clean_acronym(place)))
+            resolved = self.resolve_acronym(place)
+            if resolved:
+                names.append(resolved)
+        if hits is None:
+            return self.dbclient.lookup_names(names)
+        hits.update(self.dbclient.lookup_names(
+            name for name in names
+            if self.dbclient.parse_values(name) not in hits
+        ))
+        return hits
+
+    def get_continents(
+        self,
+        places,
+        hits: Optional[NameHits] = None,
+    ) -> Tuple[List[Continent], Set[str]]:
         continents: Set[Continent] = set()
         remaining_places = set()
         for place in places:
-            continents_dto = self.dbclient.fetch_all('continent_name', place)
-
-            potential_continents = Continent.from_dtos(continents_dto)
+            potential_continents = self.entities_by_name(
+                Continent,
+                place,
+                'continent_name',
+                hits,
+            )
 
             if potential_continents:
                 continents = continents.union(potential_continents)
@@ -73,16 +261,18 @@ class Extractor:  # noqa: WPS214
         self,
         places: List[str],
         continents: List[Continent],
+        hits: Optional[NameHits] = None,
     ) -> Tuple[List[Country], Set[str]]:
         countries: Set[Country] = set()
         remaining_places = set()
         for place in places:
             resolved = self.resolve_acronym(place)
-            countries_dto = self.dbclient.fetch_all(
-                'country_name',
+            potential_countries = self.entities_by_name(
+                Country,
                 resolved or place,
+                'country_name',
+                hits,
             )
-            potential_countries = Country.from_dtos(countries_dto)
             countries_on_continents = [
                 country for country in potential_countries
                 if country.continent in continents
@@ -101,12 +291,17 @@ class Extractor:  # noqa: WPS214
         places: Set[str],
         continents: List[Continent],
         countries: List[Country],
+        hits: Optional[NameHits] = None,
     ) -> Tuple[List[Region], Set[str]]:
         regions: Set[Region] = set()
         remaining_places = set()
         for place in places:
-            regions_dto = self.dbclient.fetch_all('subdivision_name', place)
-            potential_regions = Region.from_dtos(regions_dto)
+            potential_regions = self.entities_by_name(
+                Region,
+                place,
+                'subdivision_name',
+                hits,
+            )
             regions_in_country = [
                 region for region in potential_regions
                 if region.country in countries
@@ -128,18 +323,25 @@ class Extractor:  # noqa: WPS214
 
     # TODO: refactor ``get_cities`` to lower its Jones Complexity and local
     # variables amount
-    def get_cities(  # noqa: WPS210, WPS231
+    def get_cities(  # noqa: WPS210, WPS211, WPS231
         self,
         places: Set[str],
         continents: List[Continent],
         countries: List[Country],
         regions: List[Region],
+        hits: Optional[NameHits] = None,
+        max_candidates: Optional[int] = None,
     ) -> Tuple[List[City], Set[str]]:
         remaining_places = set()
         cities: Set[City] = set()
         for place in places:
-            cities_dto = self.dbclient.fetch_all('city_name', place)
-            potential_cities = City.from_dtos(cities_dto)
+            potential_cities = City.from_records(self.prune_cities(
+                self.records_by_name(City, place, 'city_name', hits),
+                continents,
+                countries,
+                regions,
+                max_candidates,
+            ))
             cities_in_regions = [
                 city for city in potential_cities
                 if city.region in regions
@@ -165,28 +367,82 @@ class Extractor:  # noqa: WPS214
                 remaining_places.add(place)
         return list(cities), remaining_places
 
-    def resolve_acronym(self, name: str) -> Optional[str]:
+    def prune_cities(  # noqa: WPS211
+        self,
+        records: List[Tuple],
+        continents: List[Continent],
+        countries: List[Country],
+        regions: List[Region],
+        max_candidates: Optional[int] = None,
+    ) -> List[Tuple]:
+        """Keep at most ``max_cities_per_name`` of ``City`` records.
+
+        Cities in ``regions`` are kept first, then ones in ``countries`` and
+        on ``continents``, ties are broken by record values, so pruning is
+        deterministic. Records are pruned before ``City`` instances are
+        created. ``max_candidates`` lowers the limit for a single call.
+        Updates ``cities_stats``.
+        """
+        limits = [
+            limit
+            for limit in (max_candidates, self.max_cities_per_name)
+            if limit is not None
+        ]
+        self.cities_stats.checked += 1
+        if not limits or len(records) <= min(limits):
+            return records
+        limit = min(limits)
+        context = (
+            {region.record for region in regions},
+            {country.record for country in countries},
+            {continent.name for continent in continents},
+        )
+        self.cities_stats.capped += 1
+        self.cities_stats.dropped += len(records) - limit
+        rank = functools.partial(_context_rank, context)
+        return sorted(records, key=rank)[:limit]
+
+    def clean_acronym(self, name: str) -> str:
         name_clean = remove_accents(name)
-        name_clean = self.clean_acronym_pattern.sub(EMPTY_STRING, name_clean)
-        name_upper = name_clean.upper()
-        resolved = self.acronyms_mapping.get(name_upper, EMPTY_STRING)
-        if not resolved:
-            countries_dto = self.dbclient.fetch_one_raw(
-                'country_iso_code',
-                name_clean,
-                columns='country_name',
-            )
-            if countries_dto:
-                resolved = countries_dto[0]
+        return self.clean_acronym_pattern.sub(EMPTY_STRING, name_clean)
+
+    def resolve_acronym(self, name: str) -> str:
+        """Return country name of acronym or ISO code ``name`` or ``''``.
+
+        ISO codes are resolved in-memory with ``NameIndex.iso_codes``.
+        """
+        name_clean = self.clean_acronym(name)
+        resolved = self.acronyms_mapping.get(name_clean.upper())
+        if resolved is None:
+            iso_code = remove_accents(name_clean.lower())
+            iso_codes = self.dbclient.name_index.iso_codes
+            resolved = iso_codes.get(iso_code, EMPTY_STRING)
         return resolved
 
     def is_country(self, name: str) -> bool:
-        countries, remaining_places = self.get_countries([name], [])
-        return name not in remaining_places
+        """Check if ``name`` is a country name, acronym or ISO code.
+
+        Unlike ``get_countries`` no ``Country`` instances are created.
+        """
+        countries = self.dbclient.name_index.countries
+        if self.dbclient.parse_values(name) in countries:
+            return True
+        resolved = self.resolve_acronym(name)
+        return bool(resolved) and remove_accents(resolved.lower()) in countries
 
     def is_location(self, place: str) -> bool:
-        continents, countries, regions, cities = self.find_locations([place])
-        return bool(cities or regions or countries)
+        """Check if ``place`` is a country, region or city.
+
+        Tiers are checked in-memory, cheapest first, and checking stops at
+        the first hit. Continents are not considered locations.
+        """
+        name_index = self.dbclient.name_index
+        name = self.dbclient.parse_values(place)
+        return (
+            name in name_index.cities
+            or name in name_index.regions
+            or self.is_country(place)
+        )
 
     def clean_sublocations(
         self,
@@ -197,43 +453,325 @@ class Extractor:  # noqa: WPS214
             for place in places
         )
 
+    def short_text_places(self, text: str) -> Optional[List[str]]:
+        """Return places for short ``text`` made of location names.
+
+        ``text`` is split on commas, semicolons and pipes, as in
+        user-entered locations and tag fields, and words of every segment
+        are matched with the longest capitalized location names, e.g.
+        "Warsaw Poland" gives "Warsaw" and "Poland". Places are returned
+        only when the remaining words are ``short_text_connectors`` or the
+        first word of ``text``, as in "Floods in Warsaw". Otherwise ``None``
+        is returned and ``text`` has to go through named entity recognition.
+        """
+        if len(text.split()) > self.short_text_max_words:
+            return None
+        segments = [
+            segment
+            for segment in self.segments_separator_pattern.split(text.strip())
+            if segment
+        ]
+        places: List[str] = []
+        for index, segment in enumerate(segments):
+            segment_places = self._segment_places(segment.split(), index == 0)
+            if segment_places is None:
+                return None
+            places.extend(segment_places)
+        return places or None
+
     def extract_places(self, text: str = EMPTY_STRING) -> List[str]:
+        places = self.short_text_places(text)
+        if places is not None:
+            return places
         places = self.extractor.find_entities(text)
         return list(self.clean_sublocations(places))
 
-    def find_locations(self, places: List[str]) -> _Locations:
-        continents, remaining_places = self.get_continents(places)
-        countries, remaining_places = self.get_countries(places, continents)
-        regions, remaining_places = self.get_regions(
-            remaining_places,
+    def is_candidate(self, place: str) -> bool:
+        """Check if ``place`` may be a location name, acronym or ISO code.
+
+        Uses ``DBClient.names_filter``, so it may return false positives
+        but never false negatives.
+        """
+        names_filter = self.dbclient.names_filter
+        acronym = self.clean_acronym(place)
+        return (
+            self.dbclient.parse_values(place) in names_filter
+            or acronym.upper() in self.acronyms_mapping
+            or self.dbclient.parse_values(acronym) in names_filter
+        )
+
+    def select_candidates(self, places: List[str]) -> List[str]:
+        """Drop places which are certainly not locations.
+
+        Updates ``candidates_stats``.
+        """
+        candidates = [place for place in places if self.is_candidate(place)]
+        self.candidates_stats.checked += len(places)
+        self.candidates_stats.rejected += len(places) - len(candidates)
+        return candidates
+
+    # TODO: refactor ``resolve_locations`` to lower its local variables amount
+    def resolve_locations(  # noqa: WPS210, WPS211
+        self,
+        places: List[str],
+        max_candidates: Optional[int] = None,
+        is_late: Callable[[], bool] = _never,
+        hits: Optional[NameHits] = None,
+        is_hurried: Callable[[], bool] = _always,
+    ) -> LocationsResult:
+        """Return unsorted locations, sorting is done lazily on demand.
+
+        Once ``is_hurried`` returns true, at most ``max_candidates`` cities
+        per name are considered, see ``prune_cities``. Regions and cities
+        are not resolved once ``is_late`` returns true. The result is marked
+        as partial if any of these happen. Names already probed for ``hits``
+        are not looked up again, see ``lookup_places``.
+        """
+        if self.filter_candidates:
+            places = self.select_candidates(places)
+        hits = self.lookup_places(places, hits)
+        partial = False
+        continents, remaining_places = self.get_continents(places, hits)
+        countries, remaining_places = self.get_countries(
+            places,
             continents,
-            countries,
+            hits,
         )
-        cities, remaining_places = self.get_cities(
-            remaining_places,
+        regions: List[Region] = []
+        cities: List[City] = []
+        is_skipped = is_late()
+        if not is_skipped:
+            regions, remaining_places = self.get_regions(
+                remaining_places,
+                continents,
+                countries,
+                hits,
+            )
+            is_skipped = is_late()
+        if not is_skipped:
+            limit = max_candidates if is_hurried() else None
+            capped = self.cities_stats.capped
+            cities, remaining_places = self.get_cities(
+                remaining_places,
+                continents,
+                countries,
+                regions,
+                hits,
+                limit,
+            )
+            partial = self._is_budget_capped(limit, capped)
+        return LocationsResult(
             continents,
             countries,
             regions,
+            cities,
+            partial=partial or is_skipped,
         )
-        return (
-            sorted(continents),
-            sorted(countries),
-            sorted(regions),
-            sorted(cities),
-        )
+
+    def iter_places(
+        self,
+        text: Union[str, Iterable[str]],
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> Generator[str, None, None]:
+        """Lazily yield places found in consecutive windows of ``text``.
+
+        Suitable for very large documents, ``text`` may be an iterable of
+        text parts, e.g. an opened file.
+        """
+        places = self.extractor.iter_entities(text, window_size)
+        yield from self.clean_sublocations(places)
+
+    def find_locations(
+        self,
+        places: List[str],
+        sort: bool = True,
+    ) -> Locations:
+        locations = self.resolve_locations(places)
+        if sort:
+            return locations.to_sorted()
+        return locations.to_tuple()
 
     def extract_locations(
         self,
         text: str = EMPTY_STRING,
         return_strings: bool = False,
+        sort: bool = True,
+        windowed: bool = False,
     ) -> _MaybeStrLocations:
-        places = self.extract_places(text)
-        continents, countries, regions, cities = self.find_locations(places)
-        if return_strings:
-            return (
-                Continent.many_to_string(continents),
-                Country.many_to_string(countries),
-                Region.many_to_string(regions),
-                City.many_to_string(cities),
+        """Extract locations from ``text``.
+
+        Strings are always sorted, ``sort`` only applies to ``Entity``
+        instances. If ``windowed`` is set, ``text`` is processed in
+        windows using ``iter_places`` and only distinct places are kept.
+        """
+        with self.profile(text) as report:
+            if windowed:
+                places = list(dict.fromkeys(self.iter_places(text)))
+            else:
+                places = self.extract_places(text)
+            rejected = self.candidates_stats.rejected
+            locations = self.resolve_locations(places)
+            report.places_count = len(places)
+            report.candidates_count = len(places) - (
+                self.candidates_stats.rejected - rejected
             )
-        return continents, countries, regions, cities
+            report.locations_count = sum(len(tier) for tier in locations)
+            if return_strings:
+                return locations.to_strings()
+            if sort:
+                return locations.to_sorted()
+            return locations.to_tuple()
+
+    def memory_report(self, include_models: bool = True) -> MemoryReport:
+        """Return bytes used by models and gazetteer indexes.
+
+        Components are loaded if they were not loaded yet. NLTK models are
+        skipped unless ``include_models`` is set.
+        """
+        components = {}
+        if include_models:
+            components['models.tagger'] = self.extractor.tagger
+            components['models.chunker'] = self.extractor.chunker
+        components['gazetteer.name_index'] = self.dbclient.name_index
+        components['gazetteer.names_filter'] = self.dbclient.names_filter
+        rss, private = memory_usage()
+        return MemoryReport(components_sizes(components), rss, private)
+
+    def profile(self, text: str) -> ContextManager[CallReport]:
+        """Profile a call processing ``text`` if ``profiler`` is set."""
+        if self.profiler is None:
+            return nullcontext(CallReport(len(text)))
+        return self.profiler.profile(len(text))
+
+    def extract_locations_incremental(
+        self,
+        text: str,
+        previous: Optional[DocumentState] = None,
+    ) -> Tuple[LocationsResult, DocumentState]:
+        """Extract locations from edited ``text`` reusing ``previous`` work.
+
+        ``text`` is split into paragraphs on blank lines and named entity
+        recognition runs only for paragraphs not found in ``previous``
+        document state. Only names not probed for ``previous`` are looked
+        up, its hits are updated in place. Returned state should be passed
+        with the next version of ``text``.
+        """
+        paragraphs = self._paragraphs_places(
+            text,
+            previous.paragraphs if previous else {},
+        )
+        hits = previous.hits if previous else NameHits((), ())
+        places = list(dict.fromkeys(chain.from_iterable(paragraphs.values())))
+        locations = self.resolve_locations(places, hits=hits)
+        return locations, DocumentState(paragraphs, hits)
+
+    def extract_compact_locations(
+        self,
+        text: str = EMPTY_STRING,
+    ) -> CompactLocations:
+        """Extract unsorted locations in a form cheap to pass to processes.
+
+        See ``location_extractor.serialization``.
+        """
+        return pack(self.resolve_locations(self.extract_places(text)))
+
+    def extract_locations_within(  # noqa: WPS210
+        self,
+        text: str,
+        budget: float,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> LocationsResult:
+        """Extract locations from ``text`` in about ``budget`` seconds.
+
+        When the budget is at risk cheaper strategies are used: windows of
+        ``text`` left after ``budget_ner_share`` of the budget are skipped,
+        at most ``budget_max_candidates`` cities are considered per name
+        after ``budget_candidates_share`` of it and regions and cities are
+        not resolved after ``budget_tiers_share`` of it. The result is marked
+        as partial if any of these happen.
+        """
+        started = time.monotonic()
+        ner_deadline = started + budget * self.budget_ner_share
+        candidates_deadline = started + budget * self.budget_candidates_share
+        tiers_deadline = started + budget * self.budget_tiers_share
+
+        places = self.short_text_places(text)
+        partial = False
+        if places is None:
+            found_places = {}
+            for window in iter_windows(text, window_size):
+                if time.monotonic() >= ner_deadline:
+                    partial = True
+                    break
+                entities = self.extractor.find_entities(window)
+                found_places.update(
+                    dict.fromkeys(self.clean_sublocations(entities)),
+                )
+            places = list(found_places)
+
+        locations = self.resolve_locations(
+            places,
+            max_candidates=self.budget_max_candidates,
+            is_late=lambda: time.monotonic() >= tiers_deadline,
+            is_hurried=lambda: time.monotonic() >= candidates_deadline,
+        )
+        locations.partial = locations.partial or partial
+        return locations
+
+    def _segment_places(  # noqa: WPS210
+        self,
+        words: List[str],
+        is_first: bool,
+    ) -> Optional[List[str]]:
+        places = []
+        position = 0
+        while position < len(words):
+            place, length = self._longest_place(words, position)
+            is_skipped = is_first and not position
+            is_connector = words[position] in self.short_text_connectors
+            if place is not None:
+                places.append(place)
+            elif not (is_skipped or is_connector):
+                return None
+            position += length
+        return places
+
+    def _longest_place(
+        self,
+        words: List[str],
+        start: int,
+    ) -> Tuple[Optional[str], int]:
+        """Return the longest location name starting at ``start`` word."""
+        if words[start][:1].isupper():
+            name_index = self.dbclient.name_index
+            for end in range(len(words), start, -1):
+                name = ' '.join(words[start:end])
+                place = self.sublocation_pattern.sub(EMPTY_STRING, name)
+                if self.dbclient.parse_values(place) in name_index:
+                    return place, end - start
+        return None, 1
+
+    def _is_budget_capped(self, limit: Optional[int], capped: int) -> bool:
+        configured_limit = self.max_cities_per_name
+        return (
+            limit is not None
+            and (configured_limit is None or limit < configured_limit)
+            and self.cities_stats.capped > capped
+        )
+
+    def _paragraphs_places(
+        self,
+        text: str,
+        known_paragraphs: Dict[str, List[str]],
+    ) -> Dict[str, List[str]]:
+        """Return places of paragraphs of ``text``, known ones are reused."""
+        paragraphs = {}
+        split_text = self.paragraphs_separator_pattern.split(text)
+        for paragraph in map(str.strip, split_text):
+            if not paragraph or paragraph in paragraphs:
+                continue
+            places = known_paragraphs.get(paragraph)
+            if places is None:
+                places = self.extract_places(paragraph)
+            paragraphs[paragraph] = places
+        return paragraphs
@@ -0,0 +1,172 @@
+"""Accounting of memory used by ``Extractor`` components.
+
+Sizes of components are measured by walking their object graphs, so they
+include everything kept alive by them, but not memory of the interpreter
+or of SQLite. Process-wide memory is reported by ``memory_usage``.
+"""
+import os
+import sys
+import tracemalloc
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from typing_extensions import Final
+
+_KIBIBYTE: Final = 1024
+#: objects not owned by components, e.g. classes and functions
+_SHARED_TYPES: Final = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+)
+#: marker of unset ``__slots__`` attributes
+_MISSING: Final = object()
+
+_Result = TypeVar('_Result')
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    #: bytes used by each component, see ``Extractor.memory_report``
+    components: Dict[str, int]
+    #: resident set size of the process in bytes, peak one if the current
+    #: one is unknown and ``0`` if neither is, see ``memory_usage``
+    rss: int
+    #: bytes of pages not shared with other processes, ``None`` if unknown
+    private: Optional[int]
+
+    @property
+    def total(self) -> int:
+        """Return bytes used by all components."""
+        return sum(self.components.values())
+
+
+def memory_usage() -> Tuple[int, Optional[int]]:
+    """Return resident set size and private memory of current process.
+
+    Without ``/proc`` private memory is unknown and the peak resident set
+    size of the process is returned instead of the current one, or ``0``
+    where it is unknown too, e.g. on Windows.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return _peak_rss(), None
+    # ``os.sysconf`` is available wherever ``/proc`` is
+    rss = pages * os.sysconf('SC_PAGE_SIZE')
+
+    private = None
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            private = _KIBIBYTE * sum(
+                int(line.split()[1])
+                for line in smaps
+                if line.startswith(('Private_Clean:', 'Private_Dirty:'))
+            )
+    except OSError:
+        pass  # noqa: WPS420
+    return rss, private
+
+
+def _peak_rss() -> int:
+    try:
+        import resource  # noqa: WPS433
+    except ImportError:
+        return 0
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ``ru_maxrss`` is in bytes on macOS and in kibibytes elsewhere
+    if sys.platform == 'darwin':
+        return maxrss
+    return maxrss * _KIBIBYTE
+
+
+def _referents(instance: object) -> Iterable[object]:
+    if isinstance(instance, dict):
+        yield from instance.keys()
+        yield from instance.values()
+    elif isinstance(instance, (list, tuple, set, frozenset)):
+        yield from instance
+    attributes = getattr(instance, '__dict__', None)
+    if attributes is not None:
+        yield attributes
+    for slot in getattr(type(instance), '__slots__', ()):
+        referent = getattr(instance, slot, _MISSING)
+        if referent is not _MISSING:
+            yield referent
+
+
+def deep_sizeof(instance: object, seen: Optional[Set[int]] = None) -> int:
+    """Return bytes used by ``instance`` and all objects reachable from it.
+
+    Objects in ``seen`` ids are skipped and measured ones are added to it,
+    so sharing ``seen`` between calls counts every object once.
+    """
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [instance]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        # ``numpy`` arrays report their buffers if they own them
+        size += sys.getsizeof(current)
+        stack.extend(_referents(current))
+    return size
+
+
+def components_sizes(components: Dict[str, object]) -> Dict[str, int]:
+    """Return bytes used by each of ``components``.
+
+    Objects shared by components are attributed to the first of them.
+    """
+    seen: Set[int] = set()
+    return {
+        name: deep_sizeof(component, seen)
+        for name, component in components.items()
+    }
+
+
+def allocations_peak(function: Callable[[], _Result]) -> Tuple[_Result, int]:
+    """Return result of ``function`` and peak of memory it allocated.
+
+    Allocations are traced with ``tracemalloc``, objects allocated before
+    the call are not counted. Arguments are bound with ``functools.partial``.
+    """
+    with _tracing_allocations():
+        started, _ = tracemalloc.get_traced_memory()
+        returned = function()
+        _, peak = tracemalloc.get_traced_memory()
+    return returned, max(peak - started, 0)
+
+
+@contextmanager
+def _tracing_allocations() -> Iterator[None]:
+    """Trace allocations, tracing started by someone else is not stopped."""
+    is_tracing = tracemalloc.is_tracing()
+    # ``reset_peak`` is available since Python 3.9
+    reset_peak = getattr(tracemalloc, 'reset_peak', None)
+    if not is_tracing:
+        tracemalloc.start()
+    elif reset_peak is not None:
+        reset_peak()
+    try:
+        yield
+    finally:
+        if not is_tracing:
+            tracemalloc.stop()
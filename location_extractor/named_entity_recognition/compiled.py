@@ -0,0 +1,303 @@
+"""Compact, quickly loadable form of NLTK POS tagger and NE chunker.
+
+Weights of models are compiled into ``numpy`` arrays with feature to row
+maps and saved as ``.npz`` files, which load without unpickling or
+rebuilding NLTK dictionaries of weights. Features are extracted with NLTK
+code and scores are summed in the same order as NLTK does, so compiled
+models tag and chunk exactly like the original ones.
+"""
+import json
+import os
+import zipfile
+
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from nltk.chunk.named_entity import NEChunkParser, NEChunkParserTagger
+from nltk.classify.maxent import MaxentClassifier
+from nltk.probability import sum_logs
+from nltk.tag import PerceptronTagger
+from typing_extensions import Final
+
+from location_extractor import src_dir
+from location_extractor.utils import atomic_write
+
+TAGGER_PATH: Final = os.path.join(src_dir, 'data', 'pos_tagger.npz')
+CHUNKER_PATH: Final = os.path.join(src_dir, 'data', 'ne_chunker.npz')
+#: log probability treated as zero probability, as in ``nltk.probability``
+_NINF: Final = float('-1e300')
+
+_Index = Dict[str, Iterable]
+_Feature = Tuple[str, Hashable]
+_Rows = Tuple[List[int], List[int]]
+
+if TYPE_CHECKING:
+    _Shape = Tuple[int, ...]
+    FloatArray = np.ndarray[_Shape, np.dtype[np.float64]]
+
+
+def _sequential_sum(weights: 'FloatArray') -> 'FloatArray':
+    # ``cumsum`` adds rows one by one, like NLTK does, unlike ``sum`` which
+    # uses pairwise summation and may round differently
+    if not len(weights):
+        return np.zeros(weights.shape[1])
+    return np.cumsum(weights, axis=0)[-1]
+
+
+def _weights_matrix(
+    rows: Iterable[Mapping[str, float]],
+    labels: List[str],
+) -> 'FloatArray':
+    """Return matrix of weights of ``labels`` columns, missing ones are 0."""
+    return np.array(
+        [[row.get(label, 0) for label in labels] for row in rows],
+        dtype=np.float64,
+        ndmin=2,
+    ).reshape(-1, len(labels))
+
+
+def _features_weights(
+    mapping: Mapping[Tuple[str, Hashable, str], int],
+    weights: 'FloatArray',
+) -> Dict[_Feature, Dict[str, float]]:
+    """Group ``MaxentClassifier`` weights by feature name and value."""
+    features: Dict[_Feature, Dict[str, float]] = {}
+    for joint_feature, feature_id in mapping.items():
+        label_weights = features.setdefault(joint_feature[:2], {})
+        label_weights[joint_feature[2]] = weights[feature_id]
+    return features
+
+
+def _labels_weights(
+    ids: Mapping[str, int],
+    weights: 'FloatArray',
+) -> Dict[str, float]:
+    return {label: weights[feature_id] for label, feature_id in ids.items()}
+
+
+def _save(path: str, index: _Index, **arrays: 'FloatArray') -> None:
+    """Atomically write ``.npz`` file, as ``numpy.savez_compressed`` does."""
+    with atomic_write(path) as tmp_path:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            _write_arrays(archive, index=np.array(json.dumps(index)))
+            _write_arrays(archive, **arrays)
+
+
+def _write_arrays(archive: zipfile.ZipFile, **arrays: 'FloatArray') -> None:
+    for name, array in arrays.items():
+        with archive.open(f'{name}.npy', 'w') as member:
+            np.lib.format.write_array(member, array, allow_pickle=False)
+
+
+def _load(path: str) -> Tuple[_Index, Dict[str, 'FloatArray']]:
+    with np.load(path, allow_pickle=False) as artifact:
+        arrays = {name: artifact[name] for name in artifact.files}
+    return json.loads(str(arrays.pop('index'))), arrays
+
+
+class CompiledPerceptron:
+    """``AveragedPerceptron`` prediction with a matrix of weights."""
+
+    def __init__(
+        self,
+        features: Iterable[str],
+        classes: Iterable[str],
+        weights: 'FloatArray',
+    ) -> None:
+        self.features = {feature: row for row, feature in enumerate(features)}
+        self.classes = sorted(classes)
+        self.weights = weights
+
+    @classmethod
+    def from_weights(
+        cls,
+        weights: Dict[str, Dict[str, float]],
+        classes: Iterable[str],
+    ) -> 'CompiledPerceptron':
+        classes = sorted(classes)
+        return cls(
+            weights,
+            classes,
+            _weights_matrix(weights.values(), classes),
+        )
+
+    def predict(
+        self,
+        features: Dict[str, int],
+        return_conf: bool = False,
+    ) -> Tuple[str, Optional[float]]:
+        rows, values = self._rows(features)
+        scores = _sequential_sum(
+            self.weights[rows] * np.array(values, ndmin=2).T,
+        )
+        best_label = max(zip(scores.tolist(), self.classes))[1]
+        if not return_conf:
+            return best_label, None
+        exps = np.exp(scores)
+        return best_label, float(np.max(exps / np.sum(exps)))
+
+    def _rows(self, features: Dict[str, int]) -> _Rows:
+        """Return rows of known ``features`` with non-zero values."""
+        rows = []
+        values = []
+        for feature, value in features.items():
+            row = self.features.get(feature)
+            if row is not None and value:
+                rows.append(row)
+                values.append(value)
+        return rows, values
+
+
+class CompiledMaxent:
+    """``MaxentClassifier`` classification with a matrix of weights.
+
+    Every row of ``weights`` holds weights of one feature name and value
+    for all ``labels``, unseen feature values of ``unseen`` feature names
+    have rows of their own.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        labels: List[str],
+        features: Iterable[_Feature],
+        unseen: Iterable[str],
+        weights: 'FloatArray',
+        alwayson: 'FloatArray',
+    ) -> None:
+        self._labels = labels
+        self.features = {feature: row for row, feature in enumerate(features)}
+        self.unseen = {
+            fname: row for row, fname in enumerate(unseen, len(self.features))
+        }
+        self.weights = weights
+        self.alwayson = alwayson
+
+    @classmethod
+    def from_classifier(  # noqa: WPS210
+        cls,
+        classifier: MaxentClassifier,
+    ) -> 'CompiledMaxent':
+        if not classifier._logarithmic:
+            raise ValueError('only logarithmic classifiers can be compiled')
+        encoding = classifier._encoding
+        labels = list(encoding.labels())
+        features = _features_weights(encoding._mapping, classifier._weights)
+        unseen = encoding._unseen or {}
+        # unseen values of a feature have the same weight for all labels
+        unseen_rows = (
+            dict.fromkeys(labels, classifier._weights[feature_id])
+            for feature_id in unseen.values()
+        )
+        alwayson = _labels_weights(
+            encoding._alwayson or {},
+            classifier._weights,
+        )
+        return cls(
+            labels,
+            features,
+            unseen,
+            _weights_matrix(chain(features.values(), unseen_rows), labels),
+            _weights_matrix([alwayson], labels)[0],
+        )
+
+    def labels(self) -> List[str]:
+        return self._labels
+
+    def classify(self, featureset: Dict[str, Hashable]) -> str:
+        rows = [
+            self.features.get(feature, self.unseen.get(feature[0]))
+            for feature in featureset.items()
+        ]
+        totals = _sequential_sum(
+            self.weights[[row for row in rows if row is not None]],
+        ) + self.alwayson
+        # normalized like ``DictionaryProbDist``, as rounding may tie labels
+        value_sum = sum_logs(totals.tolist())
+        if value_sum <= _NINF:
+            scores = np.zeros(len(totals)).tolist()
+        else:
+            scores = [total - value_sum for total in totals.tolist()]
+        return max(zip(scores, self._labels))[1]
+
+
+class CompiledNEChunker(NEChunkParser):
+    """``NEChunkParser`` using ``CompiledMaxent`` classifier."""
+
+    def __init__(
+        self,
+        classifier: CompiledMaxent,
+        wordlist: Iterable[str],
+    ) -> None:
+        self._tagger = NEChunkParserTagger(classifier=classifier)
+        self._tagger._en_wordlist = set(wordlist)
+
+
+def compile_tagger(tagger: PerceptronTagger, path: str = TAGGER_PATH) -> None:
+    perceptron = CompiledPerceptron.from_weights(
+        tagger.model.weights,
+        tagger.classes,
+    )
+    _save(
+        path,
+        {
+            'features': list(perceptron.features),
+            'classes': perceptron.classes,
+            'tagdict': tagger.tagdict,
+        },
+        weights=perceptron.weights,
+    )
+
+
+def load_tagger(path: str = TAGGER_PATH) -> PerceptronTagger:
+    index, arrays = _load(path)
+    tagger = PerceptronTagger(load=False)
+    tagger.model = CompiledPerceptron(
+        index['features'],
+        index['classes'],
+        arrays['weights'],
+    )
+    tagger.tagdict = index['tagdict']
+    tagger.classes = set(index['classes'])
+    return tagger
+
+
+def compile_chunker(
+    chunker: NEChunkParser,
+    path: str = CHUNKER_PATH,
+) -> None:
+    ne_tagger = chunker._tagger
+    classifier = CompiledMaxent.from_classifier(ne_tagger.classifier())
+    _save(
+        path,
+        {
+            'labels': classifier.labels(),
+            'features': [list(feature) for feature in classifier.features],
+            'unseen': list(classifier.unseen),
+            'wordlist': sorted(ne_tagger._english_wordlist()),
+        },
+        weights=classifier.weights,
+        alwayson=classifier.alwayson,
+    )
+
+
+def load_chunker(path: str = CHUNKER_PATH) -> CompiledNEChunker:
+    index, arrays = _load(path)
+    classifier = CompiledMaxent(
+        list(index['labels']),
+        (tuple(feature) for feature in index['features']),
+        index['unseen'],
+        arrays['weights'],
+        arrays['alwayson'],
+    )
+    return CompiledNEChunker(classifier, index['wordlist'])
@@ -1,13 +1,89 @@
-from typing import List
+import os
+
+from typing import Iterable, Iterator, List, Optional, Union
 
 import nltk
 
+from nltk.tag import PerceptronTagger
+from typing_extensions import Final
+
+from location_extractor.named_entity_recognition.compiled import (
+    CHUNKER_PATH,
+    TAGGER_PATH,
+    compile_chunker,
+    compile_tagger,
+    load_chunker,
+    load_tagger,
+)
+from location_extractor.named_entity_recognition.tokenizers import (
+    DEFAULT_WINDOW_SIZE,
+    TOKENIZERS,
+    iter_windows,
+)
+
+NE_CHUNKER_PICKLE: Final = (
+    'chunkers/maxent_ne_chunker/english_ace_multiclass.pickle'
+)
+
+
+def load_ne_chunker() -> nltk.chunk.ChunkParserI:
+    try:
+        from nltk.chunk import ne_chunker  # noqa: WPS433
+    except ImportError:
+        # ``nltk`` older than 3.9 loads chunker from pickle
+        return nltk.data.load(NE_CHUNKER_PICKLE)
+    return ne_chunker()
+
 
 class NERExtractor:
-    @classmethod
-    def find_entities(cls, text) -> List[str]:
-        text = nltk.word_tokenize(text)
-        named_entities = nltk.ne_chunk(nltk.pos_tag(text))
+    #: paths of models compiled by ``named_entity_recognition.compiled``
+    tagger_path = TAGGER_PATH
+    chunker_path = CHUNKER_PATH
+
+    def __init__(
+        self,
+        tokenizer: str = 'treebank',
+        compiled: bool = False,
+    ) -> None:
+        """Create extractor using one of ``TOKENIZERS``.
+
+        ``regex`` tokenizer is faster than default ``treebank`` one, see
+        ``benchmarks.tokenizers``. If ``compiled`` is set, models compiled
+        by ``named_entity_recognition.compiled`` are used, they are created
+        from NLTK ones on first use.
+        """
+        self.tokenize = TOKENIZERS[tokenizer]
+        self.compiled = compiled
+        self._tagger: Optional[PerceptronTagger] = None
+        self._chunker: Optional[nltk.chunk.ChunkParserI] = None
+
+    @property
+    def tagger(self) -> PerceptronTagger:
+        if self._tagger is None and self.compiled:
+            if not os.path.exists(self.tagger_path):
+                compile_tagger(PerceptronTagger(), self.tagger_path)
+            self._tagger = load_tagger(self.tagger_path)
+        elif self._tagger is None:
+            self._tagger = PerceptronTagger()
+        return self._tagger
+
+    @property
+    def chunker(self) -> nltk.chunk.ChunkParserI:
+        if self._chunker is None and self.compiled:
+            if not os.path.exists(self.chunker_path):
+                compile_chunker(load_ne_chunker(), self.chunker_path)
+            self._chunker = load_chunker(self.chunker_path)
+        elif self._chunker is None:
+            self._chunker = load_ne_chunker()
+        return self._chunker
+
+    def load_models(self) -> None:
+        """Load POS tagger and NE chunker models, e.g. before forking."""
+        self.find_entities('Warsaw is the capital of Poland.')
+
+    def find_entities(self, text) -> List[str]:
+        text = self.tokenize(text)
+        named_entities = self.chunker.parse(self.tagger.tag(text))
 
         places = []
         for named_entity in named_entities:
@@ -19,3 +95,15 @@ class NERExtractor:
                     places.append(found_place.strip())
 
         return places
+
+    def iter_entities(
+        self,
+        text: Union[str, Iterable[str]],
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> Iterator[str]:
+        """Lazily find entities in consecutive windows of ``text``.
+
+        Memory used does not depend on ``text`` size, see ``iter_windows``.
+        """
+        for window in iter_windows(text, window_size):
+            yield from self.find_entities(window)
@@ -0,0 +1,100 @@
+import re
+
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, List, Mapping, Union
+
+import nltk
+
+from typing_extensions import Final
+
+Tokenizer = Callable[[str], List[str]]
+
+DEFAULT_WINDOW_SIZE: Final = 10000
+_SENTENCE_END_PATTERN: Final = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+_SPACE: Final = ' '
+_QUOTE: Final = '"'
+_OPENING_QUOTE: Final = '``'
+_CLOSING_QUOTE: Final = "''"
+_TOKEN_PATTERN: Final = re.compile(
+    r'''
+        (?P<opening_quote>(?:^|(?<=[\s(\[{<]))")
+        | (?:https?://|www\.)\S+            # URLs are kept in one piece
+        | (?:Mr|Mrs|Ms|Dr|Prof|St|Jr|Sr|Gen|Gov|Sen|Rep|Lt|Col|Capt)\.
+        | (?:[A-Za-z]\.){2,}                # abbreviations, e.g. ``U.S.``
+        | \w+?(?=n't\b)                     # ``do`` of ``don't``
+        | n't\b
+        # words with apostrophes not starting clitics, e.g. ``O'Hare``
+        | \w+(?:-\w+)*(?:'(?!(?:s|m|d|ll|re|ve)\b)\w+(?:-\w+)*)+
+        | '(?:s|m|d|ll|re|ve)\b             # clitics
+        | \d+(?:[.,:]\d+)+                  # numbers, e.g. ``3.88``
+        | \w+(?:-\w+)*                      # words, e.g. ``Baden-Baden``
+        | \.\.\.|--|``|''
+        | \S                                # any other character
+    ''',
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+def regex_word_tokenize(text: str) -> List[str]:
+    """Split ``text`` into Treebank-like tokens with a single regex pass.
+
+    Unlike ``nltk.word_tokenize`` there is no sentence splitting, so every
+    period not being a part of abbreviation or number is a separate token.
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        token = match.group()
+        if match.lastgroup == 'opening_quote':
+            token = _OPENING_QUOTE
+        elif token == _QUOTE:
+            token = _CLOSING_QUOTE
+        tokens.append(token)
+    return tokens
+
+
+def iter_windows(
+    text: Union[str, Iterable[str]],
+    window_size: int = DEFAULT_WINDOW_SIZE,
+) -> Iterator[str]:
+    """Split ``text`` into consecutive windows of ``window_size`` characters.
+
+    ``text`` may be an iterable of text parts, e.g. an opened file. Windows
+    end at sentence or paragraph boundaries if there is any within
+    ``window_size`` characters, otherwise at the last space. At most two
+    windows worth of text is kept in memory.
+    """
+    parts = [text] if isinstance(text, str) else text
+    buffer = ''
+    for part in _split_parts(parts, window_size):
+        buffer = f'{buffer}{part}'
+        while len(buffer) > window_size:
+            end = _window_end(buffer, window_size)
+            yield buffer[:end]
+            buffer = buffer[end:]
+    if buffer.strip():
+        yield buffer
+
+
+def _split_parts(parts: Iterable[str], size: int) -> Iterator[str]:
+    # a stepped range, not an implicit ``enumerate``
+    return (
+        part[start:start + size]
+        for part in parts
+        for start in range(0, len(part), size)  # noqa: WPS518
+    )
+
+
+def _window_end(buffer: str, window_size: int) -> int:
+    sentences_ends = [
+        match.end()
+        for match in _SENTENCE_END_PATTERN.finditer(buffer, 0, window_size)
+    ]
+    if sentences_ends:
+        return sentences_ends[-1]
+    return buffer.rfind(_SPACE, 0, window_size) + 1 or window_size
+
+
+TOKENIZERS: Final[Mapping[str, Tokenizer]] = MappingProxyType({
+    'treebank': nltk.word_tokenize,
+    'regex': regex_word_tokenize,
+})
@@ -0,0 +1,157 @@
+"""Opt-in capture of profiles of slow ``Extractor`` calls.
+
+Every profiled call is measured and, when it takes longer than a threshold
+or is sampled, its report is written to a directory: ``.json`` file with
+``CallReport`` and, if enabled, ``.prof`` file with ``cProfile`` stats
+(readable with ``pstats``) and ``.tracemalloc`` file with a ``tracemalloc``
+snapshot (readable with ``tracemalloc.Snapshot.load``).
+"""
+import cProfile
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional
+
+from typing_extensions import Final
+
+REPORT_SUFFIX: Final = '.json'
+PROFILE_SUFFIX: Final = '.prof'
+SNAPSHOT_SUFFIX: Final = '.tracemalloc'
+
+
+@dataclass
+class CallReport:
+    """Measurements of a single profiled call, filled in by the caller."""
+
+    text_size: int
+    duration: float = 0
+    places_count: int = 0
+    candidates_count: int = 0
+    locations_count: int = 0
+
+
+class Profiler:
+    """Write reports of calls slower than ``threshold`` seconds.
+
+    Besides slow ones, ``sample_rate`` part of all calls is reported. At
+    most ``max_reports`` newest reports are kept in ``directory``.
+
+    Whether a call is slow is known only after it ends, so ``cprofile``
+    and ``trace_allocations`` slow down every call, not only reported ones.
+    Each of them makes extraction from short texts about 3 times slower,
+    so disable ``cprofile`` if durations alone are enough. Snapshots of
+    allocations are taken only for reported calls.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        directory: str,
+        threshold: float = 1,
+        sample_rate: float = 0,
+        max_reports: int = 100,
+        cprofile: bool = True,
+        trace_allocations: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.directory = directory
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_reports = max_reports
+        self.cprofile = cprofile
+        self.trace_allocations = trace_allocations
+        self._random = random.Random(seed)
+        self._reported = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def profile(self, text_size: int) -> Iterator[CallReport]:
+        report = CallReport(text_size)
+        profile = cProfile.Profile() if self.cprofile else None
+        snapshot = None
+        with self._traced_allocations():
+            with _enabled(profile):
+                started = time.perf_counter()
+                try:
+                    yield report
+                finally:
+                    report.duration = time.perf_counter() - started
+            is_reported = self._is_reported(report)
+            if is_reported and self.trace_allocations:
+                snapshot = tracemalloc.take_snapshot()
+        if is_reported:
+            self.write_report(report, profile, snapshot)
+
+    def write_report(
+        self,
+        report: CallReport,
+        profile: Optional[cProfile.Profile] = None,
+        snapshot: Optional[tracemalloc.Snapshot] = None,
+    ) -> str:
+        """Write report files and drop the oldest ones, return their stem."""
+        # nanoseconds timestamp keeps names in chronological order
+        timestamp = time.time_ns()
+        stem = os.path.join(
+            self.directory,
+            f'{timestamp:020d}-{os.getpid()}-{self._reported}',
+        )
+        self._reported += 1
+        if profile is not None:
+            profile.dump_stats(f'{stem}{PROFILE_SUFFIX}')
+        if snapshot is not None:
+            snapshot.dump(f'{stem}{SNAPSHOT_SUFFIX}')
+        with open(f'{stem}{REPORT_SUFFIX}', 'w') as report_file:
+            json.dump(asdict(report), report_file)
+        self.remove_old_reports()
+        return stem
+
+    def reports(self) -> List[str]:
+        """Return stems of reports in ``directory``, oldest first."""
+        return sorted(
+            os.path.join(self.directory, filename[:-len(REPORT_SUFFIX)])
+            for filename in os.listdir(self.directory)
+            if filename.endswith(REPORT_SUFFIX)
+        )
+
+    def remove_old_reports(self) -> None:
+        reports = self.reports()
+        for stem in reports[:max(len(reports) - self.max_reports, 0)]:
+            for suffix in (REPORT_SUFFIX, PROFILE_SUFFIX, SNAPSHOT_SUFFIX):
+                if os.path.exists(f'{stem}{suffix}'):
+                    os.remove(f'{stem}{suffix}')
+
+    def _is_reported(self, report: CallReport) -> bool:
+        # drawn for every call, so seeded profilers sample the same calls
+        is_sampled = self._random.random() < self.sample_rate
+        return is_sampled or report.duration >= self.threshold
+
+    @contextmanager
+    def _traced_allocations(self) -> Iterator[None]:
+        """Trace allocations if ``trace_allocations`` is set.
+
+        Tracing started by someone else is not stopped.
+        """
+        is_tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if is_tracing:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if is_tracing:
+                tracemalloc.stop()
+
+
+@contextmanager
+def _enabled(profile: Optional[cProfile.Profile]) -> Iterator[None]:
+    if profile is None:
+        yield
+        return
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
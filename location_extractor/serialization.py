@@ -0,0 +1,139 @@
+"""Compact representation of locations for sending between processes.
+
+Every ``Entity`` is flattened into a tuple of indexes into a shared table
+of strings, so ``CompactLocations`` consists only of tuples, strings and
+integers. It pickles cheaply and can be passed as-is to JSON or msgpack
+encoders.
+"""
+import json
+
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from location_extractor.containers import (
+    City,
+    Continent,
+    Country,
+    Locations,
+    Region,
+)
+
+NO_REGION = -1
+
+_Indexes = Tuple[int, ...]
+
+
+class CompactLocations(NamedTuple):
+    """Entities as tuples of indexes of their names in ``strings``.
+
+    Indexes of continents are ``name``, of countries ``name, iso_code,
+    continent``, of regions ``name, country, iso_code, continent`` and of
+    cities ``name, region, country, iso_code, continent``, where region
+    is ``NO_REGION`` for cities without one.
+    """
+
+    strings: Tuple[str, ...]
+    continents: Tuple[_Indexes, ...]
+    countries: Tuple[_Indexes, ...]
+    regions: Tuple[_Indexes, ...]
+    cities: Tuple[_Indexes, ...]
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.indexes: Dict[str, int] = {}
+
+    def __call__(self, string: str) -> int:
+        return self.indexes.setdefault(string, len(self.indexes))
+
+    def strings(self) -> Tuple[str, ...]:
+        return tuple(self.indexes)
+
+
+def _pack_country(country: Country, index: _StringTable) -> _Indexes:
+    return (
+        index(country.name),
+        index(country.iso_code),
+        index(country.continent.name),
+    )
+
+
+def pack(locations: Iterable[List]) -> CompactLocations:
+    """Flatten continents, countries, regions and cities lists."""
+    continents, countries, regions, cities = locations
+    index = _StringTable()
+    # keyword arguments are evaluated in order, so ``strings`` are complete
+    return CompactLocations(
+        continents=tuple(
+            (index(continent.name),) for continent in continents
+        ),
+        countries=tuple(
+            _pack_country(country, index) for country in countries
+        ),
+        regions=tuple(
+            (index(region.name), *_pack_country(region.country, index))
+            for region in regions
+        ),
+        cities=tuple(
+            (
+                index(city.name),
+                index(city.region.name) if city.region else NO_REGION,
+                *_pack_country(city.country, index),
+            )
+            for city in cities
+        ),
+        strings=index.strings(),
+    )
+
+
+def _unpack_country(strings: Tuple[str, ...], indexes: _Indexes) -> Country:
+    name, iso_code, continent = indexes
+    return Country(
+        name=strings[name],
+        iso_code=strings[iso_code],
+        continent=Continent(name=strings[continent]),
+    )
+
+
+def _unpack_city(strings: Tuple[str, ...], indexes: _Indexes) -> City:
+    name, region, *country_indexes = indexes
+    country = _unpack_country(strings, tuple(country_indexes))
+    return City(
+        name=strings[name],
+        region=(
+            None if region == NO_REGION
+            else Region(name=strings[region], country=country)
+        ),
+        country=country,
+    )
+
+
+def unpack(compact: CompactLocations) -> Locations:
+    """Rebuild ``Entity`` instances from ``CompactLocations``."""
+    strings = compact.strings
+    return (
+        [
+            Continent(name=strings[continent[0]])
+            for continent in compact.continents
+        ],
+        [_unpack_country(strings, country) for country in compact.countries],
+        [
+            Region(
+                name=strings[region[0]],
+                country=_unpack_country(strings, region[1:]),
+            )
+            for region in compact.regions
+        ],
+        [_unpack_city(strings, city) for city in compact.cities],
+    )
+
+
+def dumps(compact: CompactLocations) -> str:
+    return json.dumps(compact, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(serialized: str) -> CompactLocations:
+    strings, *tiers = json.loads(serialized)
+    return CompactLocations(
+        tuple(strings),
+        *(tuple(map(tuple, entities)) for entities in tiers),
+    )
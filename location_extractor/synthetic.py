@@ -0,0 +1,158 @@
+"""Deterministic generator of synthetic gazetteers.
+
+Generated CSV files have the processed GeoLite2 format read by
+``DBClient``, so tests and benchmarks can use realistic data volumes
+without the GeoLite2 database.
+"""
+import csv
+import random
+import string
+
+from dataclasses import dataclass
+from functools import partial
+from itertools import product
+from typing import Iterator, List, Tuple
+
+from typing_extensions import Final
+
+from location_extractor.clients import LOCATIONS_COLUMNS
+
+#: amount of cities in a gazetteer generated with ``scale=1``
+BASE_CITIES_COUNT: Final = 10000
+CONTINENTS: Final = (
+    ('AF', 'Africa', False),
+    ('AS', 'Asia', False),
+    ('EU', 'Europe', True),
+    ('NA', 'North America', False),
+    ('OC', 'Oceania', False),
+    ('SA', 'South America', False),
+)
+#: value of columns of tiers a location is not in
+_NO_NAME: Final = ''
+_SYLLABLES: Final = tuple(
+    f'{consonant}{vowel}'
+    for consonant in 'bdgklmnprstvz'
+    for vowel in 'aeiou'
+)
+
+
+@dataclass(frozen=True)
+class GazetteerSpec:
+    """Shape of generated gazetteer, with at most 676 countries.
+
+    ``ambiguity`` is a chance that a city reuses the name of one of
+    previously generated cities, chosen with Zipf-like distribution, so
+    that some names like "Springfield" repeat many times.
+    """
+
+    scale: float = 1
+    countries_count: int = 200
+    regions_per_country: int = 20
+    ambiguity: float = 0.1
+    seed: int = 0
+    locale: str = 'en'
+
+    @property
+    def cities_count(self) -> int:
+        return round(BASE_CITIES_COUNT * self.scale)
+
+
+@dataclass(frozen=True)
+class _Country:
+    continent: Tuple[str, str, bool]
+    iso_code: str
+    name: str
+
+    def row(
+        self,
+        locale: str,
+        region_name: str = _NO_NAME,
+        city_name: str = _NO_NAME,
+    ) -> Tuple:
+        """Return ``LOCATIONS_COLUMNS`` values of a location in country."""
+        continent_code, continent_name, in_eu = self.continent
+        return (
+            locale,
+            continent_code,
+            continent_name,
+            self.iso_code,
+            self.name,
+            region_name,
+            city_name,
+            in_eu,
+        )
+
+
+def _name(generator: random.Random, syllables: int) -> str:
+    return ''.join(
+        generator.choice(_SYLLABLES) for _ in range(syllables)
+    ).capitalize()
+
+
+def _countries(
+    spec: GazetteerSpec,
+    generator: random.Random,
+) -> List[_Country]:
+    iso_codes = (
+        f'{first}{second}'
+        for first, second in product(string.ascii_uppercase, repeat=2)
+    )
+    return [
+        _Country(
+            continent=generator.choice(CONTINENTS),
+            iso_code=next(iso_codes),
+            name=_name(generator, generator.randint(2, 4)),
+        )
+        for _ in range(spec.countries_count)
+    ]
+
+
+def _city_names(
+    spec: GazetteerSpec,
+    generator: random.Random,
+) -> Iterator[str]:
+    city_names: List[str] = []
+    for city_index in range(spec.cities_count):
+        # the first city always gets a new name
+        if city_index and generator.random() < spec.ambiguity:
+            # ``paretovariate`` makes first names much more popular
+            rank = int(generator.paretovariate(1)) - 1
+            yield city_names[min(rank, len(city_names) - 1)]
+        else:
+            city_name = _name(generator, generator.randint(2, 4))
+            city_names.append(city_name)
+            yield city_name
+
+
+def generate_locations(spec: GazetteerSpec) -> Iterator[Tuple]:
+    """Yield ``LOCATIONS_COLUMNS`` values of generated locations."""
+    generator = random.Random(spec.seed)
+    countries = _countries(spec, generator)
+    #: ``row`` of every region, missing only the city name
+    region_rows = [
+        partial(
+            country.row,
+            spec.locale,
+            _name(generator, generator.randint(2, 5)),
+        )
+        for country in countries
+        for _ in range(spec.regions_per_country)
+    ]
+    yield from (country.row(spec.locale) for country in countries)
+    # names and regions are drawn alternately from the same generator
+    yield from (
+        generator.choice(region_rows)(city_name)
+        for city_name in _city_names(spec, generator)
+    )
+
+
+def write_locations_csv(spec: GazetteerSpec, path: str) -> int:
+    """Write generated gazetteer to ``path``, return amount of rows."""
+    rows_count = 0
+    with open(path, 'w', newline='') as locations_file:
+        writer = csv.writer(locations_file)
+        writer.writerow(LOCATIONS_COLUMNS)
+        for row in generate_locations(spec):
+            writer.writerow(row)
+            rows_count += 1
+    return rows_count
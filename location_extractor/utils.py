@@ -1,7 +1,18 @@
+import os
+import stat
+import tempfile
+
+from contextlib import contextmanager
+from typing import Iterator
+
 import jellyfish
 
+from typing_extensions import Final
 from unidecode import unidecode_expect_nonascii
 
+#: mode of files created with ``open`` before applying umask
+_DEFAULT_FILE_MODE: Final = 0o666
+
 
 def fuzzy_match(text1: str, text2: str, max_dist: int = 6) -> bool:
     return jellyfish.levenshtein_distance(text1, text2) <= max_dist
@@ -13,3 +24,41 @@ def remove_accents(place: str) -> str:
 
 def parse_query_param(query_param: str) -> str:
     return remove_accents(query_param.lower()).replace("'", r"\'")
+
+
+@contextmanager
+def atomic_write(path: str) -> Iterator[str]:
+    """Yield path of temporary file which then atomically replaces ``path``.
+
+    The temporary file is created next to ``path`` and removed if writing
+    it fails. It gets the mode of the replaced file, or the mode ``open``
+    would create ``path`` with, as ``tempfile.mkstemp`` creates files
+    readable only by their owner.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        suffix=os.path.splitext(path)[1],
+    )
+    os.close(fd)
+    # the temporary file is replaced or removed, even if interrupted
+    try:  # noqa: WPS229
+        os.chmod(tmp_path, _file_mode(path))
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _file_mode(path: str) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return _DEFAULT_FILE_MODE & ~_umask()
+
+
+def _umask() -> int:
+    # umask can only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
@@ -0,0 +1,119 @@
+"""Pool of worker processes forked from a warmed-up ``Extractor``.
+
+NLTK models and gazetteer indexes are loaded once in the parent process and
+frozen with ``gc.freeze``, so that workers share their memory pages
+copy-on-write instead of loading them on their own. Requires ``fork`` start
+method, i.e. it is not available on Windows.
+"""
+import gc
+import multiprocessing
+import os
+import time
+
+from dataclasses import dataclass
+from multiprocessing.pool import Pool
+from typing import Iterable, Iterator, List, Optional
+
+from typing_extensions import Final
+
+from location_extractor.extractor import Extractor
+from location_extractor.memory import memory_usage
+from location_extractor.serialization import CompactLocations
+
+_WORKER_STATS_TIMEOUT: Final = 60
+
+#: ``Extractor`` inherited by forked workers, set by ``WarmPool``
+_extractor: Optional[Extractor] = None
+
+
+@dataclass(frozen=True)
+class WorkerStats:
+    pid: int
+    #: seconds between starting the pool and worker being ready
+    spawn_time: float
+    #: resident set size in bytes, includes pages shared with the parent
+    rss: int
+    #: bytes of pages not shared with other processes, ``None`` if unknown
+    private: Optional[int]
+
+
+def _init_worker(started: float, stats_queue: multiprocessing.Queue) -> None:
+    rss, private = memory_usage()
+    stats_queue.put(WorkerStats(
+        pid=os.getpid(),
+        spawn_time=time.perf_counter() - started,
+        rss=rss,
+        private=private,
+    ))
+
+
+def _extract_compact_locations(text: str) -> CompactLocations:
+    assert _extractor is not None  # noqa: S101
+    return _extractor.extract_compact_locations(text)
+
+
+class WarmPool:
+    """Process pool extracting locations with a shared warm ``Extractor``.
+
+    Results are returned as ``CompactLocations``, which are cheap to send
+    between processes, see ``location_extractor.serialization``.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        extractor: Optional[Extractor] = None,
+        load_models: bool = True,
+    ) -> None:
+        extractor = extractor or Extractor()
+        if load_models:
+            extractor.extractor.load_models()
+        extractor.dbclient.name_index  # noqa: WPS428
+        extractor.dbclient.names_filter  # noqa: WPS428
+        # the module global, not a local, is inherited by forked workers
+        global _extractor  # noqa: WPS420
+        _extractor = extractor  # noqa: WPS122, WPS442
+
+        # objects which survived until now are never collected, so workers
+        # do not touch (and copy) their pages updating GC bookkeeping
+        gc.collect()
+        gc.freeze()
+
+        context = multiprocessing.get_context('fork')
+        stats_queue = context.Queue()
+        self.processes = processes or os.cpu_count() or 1
+        self.pool: Pool = context.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(time.perf_counter(), stats_queue),
+        )
+        self.workers_stats: List[WorkerStats] = [
+            stats_queue.get(timeout=_WORKER_STATS_TIMEOUT)
+            for _ in range(self.processes)
+        ]
+
+    def __enter__(self) -> 'WarmPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # named after ``Pool.map`` it wraps
+    def map(  # noqa: WPS125
+        self,
+        texts: Iterable[str],
+        chunksize: int = 1,
+    ) -> List[CompactLocations]:
+        return self.pool.map(_extract_compact_locations, texts, chunksize)
+
+    def imap(
+        self,
+        texts: Iterable[str],
+        chunksize: int = 1,
+    ) -> Iterator[CompactLocations]:
+        return self.pool.imap(_extract_compact_locations, texts, chunksize)
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+        gc.unfreeze()
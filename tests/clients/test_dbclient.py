@@ -1,10 +1,17 @@
 import operator
 import os
+import shutil
 import sqlite3
+import stat
+
+from unittest import mock
 
 import pytest
 
-from location_extractor.clients import LocationDTO
+from location_extractor.bloom import BloomFilter
+from location_extractor.clients import DBClient, LocationDTO
+
+FILE_MODE = 0o644
 
 
 def test_populate_locations_table(dbclient):
@@ -45,3 +52,210 @@ def test_fetch_one(dbclient):
     country = dbclient.fetch_one('continent_name', 'Asia')
     assert isinstance(country, LocationDTO)
     assert country.continent_name == 'Asia'
+
+
+@pytest.fixture(name='updated_locations_path')
+def create_updated_locations_path(fixture_locations_path, tmp_path):
+    """Return path of fixture locations without Prague and with Madrid."""
+    with open(fixture_locations_path) as locations_file:
+        header, *rows = locations_file.readlines()
+    rows = [row for row in rows if ',Prague,' not in row]
+    rows.append('en,EU,Europe,ES,Spain,Madrid,Madrid,True\n')
+    updated_path = tmp_path / 'locations-updated.csv'
+    updated_path.write_text(''.join([header, *rows]))
+    return str(updated_path)
+
+
+def test_update_locations_table(fixture_dbclient, updated_locations_path):
+    diff = fixture_dbclient.update_locations_table(updated_locations_path)
+
+    assert (diff.added, diff.removed) == (1, 1)
+    assert fixture_dbclient.fetch_one_raw('city_name', 'Madrid') is not None
+    assert fixture_dbclient.fetch_one_raw('city_name', 'Prague') is None
+    assert fixture_dbclient.fetch_one_raw('city_name', 'Warsaw') is not None
+
+
+def test_update_locations_table_updates_names(
+    fixture_dbclient,
+    updated_locations_path,
+):
+    fixture_dbclient.update_locations_table(updated_locations_path)
+
+    hits = fixture_dbclient.lookup_names(['Madrid', 'Prague', 'Spain'])
+    assert hits.records('madrid', 'city_name') == [
+        ('Madrid', 'Madrid', 'Spain', 'ES', 'Europe'),
+    ]
+    assert hits.records('madrid', 'subdivision_name')
+    assert hits.records('spain', 'country_name')
+    assert not hits.records('prague', 'city_name')
+
+
+def test_update_keeps_open_connections(
+    fixture_dbclient,
+    updated_locations_path,
+):
+    reader = fixture_dbclient.connection
+
+    fixture_dbclient.update_locations_table(updated_locations_path)
+
+    # connection opened before the update still reads the previous data
+    assert reader.execute(
+        "SELECT city_name FROM locations WHERE city_name='Prague'",
+    ).fetchone() == ('Prague',)
+
+
+def test_update_locations_table_keeps_file_mode(
+    fixture_dbclient,
+    updated_locations_path,
+):
+    os.chmod(fixture_dbclient.dbpath, FILE_MODE)
+
+    fixture_dbclient.update_locations_table(updated_locations_path)
+
+    assert stat.S_IMODE(os.stat(fixture_dbclient.dbpath).st_mode) == (
+        FILE_MODE
+    )
+
+
+def test_update_locations_table_without_changes(fixture_dbclient):
+    diff = fixture_dbclient.update_locations_table(
+        fixture_dbclient.locations_path,
+    )
+
+    assert (diff.added, diff.removed) == (0, 0)
+
+
+def test_names_filter_is_rebuilt_on_update(fixture_dbclient, tmp_path):
+    updated_path = tmp_path / 'locations-updated.csv'
+    with open(fixture_dbclient.locations_path) as locations_file:
+        rows = locations_file.read()
+    updated_path.write_text(f'{rows}en,EU,Europe,ES,Spain,,Madrid,True\n')
+    assert 'madrid' not in fixture_dbclient.names_filter
+
+    fixture_dbclient.update_locations_table(str(updated_path))
+
+    assert 'madrid' in fixture_dbclient.names_filter
+    assert 'madrid' in BloomFilter.load(fixture_dbclient.names_filter_path)
+
+
+def test_names_filter_reloaded_after_other_update(
+    fixture_dbclient,
+    tmp_path,
+):
+    updated_path = tmp_path / 'locations-updated.csv'
+    with open(fixture_dbclient.locations_path) as locations_file:
+        rows = locations_file.read()
+    updated_path.write_text(f'{rows}en,EU,Europe,ES,Spain,,Madrid,True\n')
+    other_dbclient = DBClient(
+        dbpath=fixture_dbclient.dbpath,
+        locations_path=fixture_dbclient.locations_path,
+    )
+    other_dbclient.stamp_check_interval = 0
+    assert 'madrid' not in other_dbclient.names_filter
+    assert 'madrid' not in other_dbclient.name_index.cities
+
+    fixture_dbclient.update_locations_table(str(updated_path))
+
+    assert 'madrid' in other_dbclient.names_filter
+    assert 'madrid' in other_dbclient.name_index.cities
+    assert other_dbclient.names_filter.stamp == (
+        fixture_dbclient.database_stamp
+    )
+
+
+def test_stale_names_filter_file_is_rebuilt(fixture_dbclient):
+    stale_filter = BloomFilter.from_names(
+        ['atlantis'],
+        fixture_dbclient.names_filter_false_positive_rate,
+    )
+    stale_filter.dump(fixture_dbclient.names_filter_path)
+
+    dbclient = DBClient(
+        dbpath=fixture_dbclient.dbpath,
+        locations_path=fixture_dbclient.locations_path,
+    )
+
+    assert 'warsaw' in dbclient.names_filter
+    assert BloomFilter.load(dbclient.names_filter_path).stamp == (
+        dbclient.database_stamp
+    )
+
+
+def test_copied_names_filter_file_is_not_rebuilt(fixture_dbclient, tmp_path):
+    copy_dir = tmp_path / 'copy'
+    copy_dir.mkdir()
+    for path in (fixture_dbclient.dbpath, fixture_dbclient.names_filter_path):
+        shutil.copy(path, copy_dir)
+    copied_filter_path = copy_dir / 'data.bloom'
+    copied_filter_mtime = copied_filter_path.stat().st_mtime_ns
+
+    dbclient = DBClient(
+        dbpath=str(copy_dir / 'data.db'),
+        locations_path=fixture_dbclient.locations_path,
+    )
+
+    assert 'warsaw' in dbclient.names_filter
+    assert copied_filter_path.stat().st_mtime_ns == copied_filter_mtime
+
+
+def test_unstored_names_filter_is_kept_in_memory(
+    fixture_dbclient,
+    monkeypatch,
+):
+    os.remove(fixture_dbclient.names_filter_path)
+    monkeypatch.setattr(
+        BloomFilter,
+        'dump',
+        mock.Mock(side_effect=PermissionError('read-only')),
+    )
+
+    dbclient = DBClient(
+        dbpath=fixture_dbclient.dbpath,
+        locations_path=fixture_dbclient.locations_path,
+    )
+
+    assert 'warsaw' in dbclient.names_filter
+    assert not os.path.exists(dbclient.names_filter_path)
+
+
+def test_lookup_names(fixture_dbclient):
+    hits = fixture_dbclient.lookup_names(['Berlin', 'pl', 'Atlantis'])
+
+    assert hits.names == {'berlin', 'pl', 'atlantis'}
+    assert len(hits.records('berlin', 'city_name')) == 5
+    assert hits.records('pl', 'country_iso_code') == [
+        ('', '', 'Poland', 'PL', 'Europe'),
+    ]
+    assert not hits.records('atlantis', 'city_name')
+
+
+def test_sharded_dbclient(fixture_sharded_dbclient):
+    hits = fixture_sharded_dbclient.lookup_names(['Berlin', 'Warschau'])
+
+    assert len(hits.records('berlin', 'city_name')) == 6
+    assert hits.records('warschau', 'city_name') == [
+        ('Warschau', 'Masowien', 'Polen', 'PL', 'Europa'),
+    ]
+
+
+def test_sharded_dbclient_indexes(fixture_sharded_dbclient):
+    assert 'polen' in fixture_sharded_dbclient.name_index.countries
+    assert 'poland' in fixture_sharded_dbclient.name_index.countries
+    assert 'prag' in fixture_sharded_dbclient.names_filter
+    assert fixture_sharded_dbclient.fetch_one_raw(
+        'country_iso_code',
+        'de',
+        'country_name',
+    ) == ('Germany',)
+
+
+def test_sharded_dbclient_iso_codes(fixture_sharded_dbclient):
+    iso_codes = fixture_sharded_dbclient.name_index.iso_codes
+
+    # shards of the first locales take precedence
+    assert iso_codes['de'] == 'Germany'
+    assert iso_codes['pl'] == 'Poland'
+    assert set(iso_codes) == set().union(*(
+        shard.name_index.iso_codes
+        for shard in fixture_sharded_dbclient.shards
+    ))
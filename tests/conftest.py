@@ -2,7 +2,7 @@ import os
 
 import pytest
 
-from location_extractor.clients import DBClient
+from location_extractor.clients import DBClient, ShardedDBClient
 from location_extractor.extractor import Extractor
 from location_extractor.named_entity_recognition.geograpy_nltk import (
     download_nltk,
@@ -11,6 +11,8 @@ from location_extractor.named_entity_recognition.ner import NERExtractor
 
 download_nltk()
 
+fixtures_dir = os.path.join(os.path.dirname(__file__), 'fixtures')
+
 
 @pytest.fixture(scope='session')
 def location_extractor():
@@ -26,5 +28,36 @@ def ner_extractor():
 def dbclient():
     client = DBClient()
     yield client
-    if os.path.exists(client.dbpath):
-        os.remove(client.dbpath)
+    for path in (client.dbpath, client.names_filter_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@pytest.fixture(name='fixture_locations_path')
+def create_fixture_locations_path():
+    return os.path.join(fixtures_dir, 'locations-en.csv')
+
+
+@pytest.fixture(name='fixture_dbclient')
+def create_fixture_dbclient(tmp_path, fixture_locations_path):
+    return DBClient(
+        dbpath=str(tmp_path / 'data.db'),
+        locations_path=fixture_locations_path,
+    )
+
+
+@pytest.fixture()
+def fixture_extractor(fixture_dbclient):
+    return Extractor(dbclient=fixture_dbclient)
+
+
+@pytest.fixture()
+def fixture_sharded_dbclient(tmp_path, fixture_dbclient):
+    return ShardedDBClient([
+        fixture_dbclient,
+        DBClient(
+            dbpath=str(tmp_path / 'data-de.db'),
+            locations_path=os.path.join(fixtures_dir, 'locations-de.csv'),
+            locale='de',
+        ),
+    ])
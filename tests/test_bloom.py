@@ -0,0 +1,68 @@
+import os
+import stat
+
+import pytest
+
+from location_extractor.bloom import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    names = {f'city {index}' for index in range(1000)}
+
+    bloom_filter = BloomFilter.from_names(names, false_positive_rate=0.01)
+
+    assert all(name in bloom_filter for name in names)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = BloomFilter.from_names(
+        (f'city {index}' for index in range(1000)),
+        false_positive_rate=0.01,
+    )
+
+    false_positives = sum(
+        f'person {index}' in bloom_filter for index in range(10000)
+    )
+
+    assert false_positives < 200
+
+
+def test_bloom_filter_dump_and_load(tmp_path):
+    path = str(tmp_path / 'names.bloom')
+    bloom_filter = BloomFilter.from_names(['warsaw'], 0.01)
+    bloom_filter.stamp = -1
+
+    bloom_filter.dump(path)
+    loaded = BloomFilter.load(path)
+
+    assert (loaded.size, loaded.hash_count, loaded.stamp) == (
+        bloom_filter.size,
+        bloom_filter.hash_count,
+        bloom_filter.stamp,
+    )
+    assert 'warsaw' in loaded
+
+
+def test_bloom_filter_dump_keeps_file_mode(tmp_path):
+    path = tmp_path / 'names.bloom'
+    path.write_bytes(b'')
+    path.chmod(0o644)
+
+    BloomFilter.from_names(['warsaw'], 0.01).dump(str(path))
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+
+@pytest.fixture(name='umask')
+def set_umask():
+    previous_umask = os.umask(0o22)
+    yield 0o22
+    os.umask(previous_umask)
+
+
+def test_bloom_filter_dump_applies_umask(tmp_path, umask):
+    path = tmp_path / 'names.bloom'
+
+    BloomFilter.from_names(['warsaw'], 0.01).dump(str(path))
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
@@ -0,0 +1,107 @@
+import nltk
+import pytest
+
+from nltk.chunk.named_entity import NEChunkParser, NEChunkParserTagger
+from nltk.classify.maxent import MaxentClassifier
+from nltk.tag import PerceptronTagger
+
+from location_extractor.named_entity_recognition.compiled import (
+    CompiledMaxent,
+    compile_chunker,
+    compile_tagger,
+    load_chunker,
+    load_tagger,
+)
+from location_extractor.named_entity_recognition.ner import NERExtractor
+
+TAGGED_SENTENCES = (
+    (('Warsaw', 'NNP'), ('is', 'VBZ'), ('in', 'IN'), ('Poland', 'NNP')),
+    (('She', 'PRP'), ('lives', 'VBZ'), ('in', 'IN'), ('Berlin', 'NNP')),
+    (('The', 'DT'), ('city', 'NN'), ('is', 'VBZ'), ('big', 'JJ')),
+    (('John', 'NNP'), ('went', 'VBD'), ('to', 'TO'), ('Paris', 'NNP')),
+)
+CORPUS = (
+    ' '.join((
+        'It is early morning in Nairobi, the Kenyan capital.',
+        'The traffic jam along Ngong Road has already built up.',
+    )),
+    'There is a city called São Paulo in Brazil.',
+    'She went to south america then moved to Hawaii and flew to Australia.',
+    ' '.join((
+        'Plumber in Worcester, Massachusetts.',
+        'Mr. Smith\'s company "Acme" opened offices in the U.S.',
+        'and in Berlin, Germany, for $3.88 million.',
+    )),
+)
+
+
+def _chunk_tree(sentence):
+    return nltk.tree.Tree('S', [
+        nltk.tree.Tree('GPE', [token]) if token[1] == 'NNP' else token
+        for token in sentence
+    ])
+
+
+def test_compiled_tagger_tags_like_nltk(tmp_path):
+    tagger = PerceptronTagger(load=False)
+    tagger.train([list(sentence) for sentence in TAGGED_SENTENCES])
+    path = str(tmp_path / 'tagger.npz')
+
+    compile_tagger(tagger, path)
+    compiled = load_tagger(path)
+
+    sentences = (
+        ['Warsaw', 'is', 'big'],
+        ['Mary', 'moved', 'to', 'Prague', 'in', '1999'],
+        [],
+    )
+    for sentence in sentences:
+        assert compiled.tag(sentence) == tagger.tag(sentence)
+
+
+def test_compiled_maxent_classifies_like_nltk():
+    train = [
+        ({'shape': 'upcase', 'len': 6, 'known': False}, 'GPE'),
+        ({'shape': 'upcase', 'len': 4, 'known': True}, 'O'),
+        ({'shape': 'downcase', 'len': 4, 'known': True}, 'O'),
+        ({'shape': 'upcase', 'len': 5, 'known': False}, 'PERSON'),
+    ]
+    classifier = MaxentClassifier.train(train, trace=0, max_iter=10)
+
+    compiled = CompiledMaxent.from_classifier(classifier)
+
+    for featureset, _ in train:
+        assert compiled.classify(featureset) == (
+            classifier.classify(featureset)
+        )
+    unseen = {'shape': 'mixedcase', 'len': 9, 'known': None}
+    assert compiled.classify(unseen) == classifier.classify(unseen)
+
+
+def test_compiled_chunker_chunks_like_nltk(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        NEChunkParserTagger,
+        '_english_wordlist',
+        lambda _: {'is', 'in', 'the', 'city', 'big', 'to'},
+    )
+    chunker = NEChunkParser([
+        _chunk_tree(sentence) for sentence in TAGGED_SENTENCES
+    ])
+    path = str(tmp_path / 'chunker.npz')
+
+    compile_chunker(chunker, path)
+    compiled = load_chunker(path)
+
+    for sentence in TAGGED_SENTENCES:
+        assert compiled.parse(list(sentence)) == chunker.parse(list(sentence))
+
+
+@pytest.mark.parametrize('text', CORPUS)
+def test_compiled_models_find_same_entities(text, ner_extractor, tmp_path):
+    compiled_extractor = NERExtractor(compiled=True)
+    compiled_extractor.tagger_path = str(tmp_path / 'tagger.npz')
+    compiled_extractor.chunker_path = str(tmp_path / 'chunker.npz')
+
+    assert compiled_extractor.find_entities(text) == (
+        ner_extractor.find_entities(text)
+    )
@@ -0,0 +1,43 @@
+from location_extractor.containers import (
+    City,
+    Continent,
+    Country,
+    LocationsResult,
+    Region,
+)
+
+europe = Continent(name='Europe')
+poland = Country(name='Poland', iso_code='PL', continent=europe)
+germany = Country(name='Germany', iso_code='DE', continent=europe)
+mazovia = Region(name='Mazovia', country=poland)
+
+
+def test_sort_key():
+    warsaw = City(name='Warsaw', region=mazovia, country=poland)
+
+    assert warsaw.sort_key == ('Europe', 'Poland', 'Mazovia', 'Warsaw')
+    assert sorted([poland, germany]) == [germany, poland]
+
+
+def test_record_is_inverse_of_from_record():
+    warsaw = City(name='Warsaw', region=mazovia, country=poland)
+
+    assert warsaw.record == ('Warsaw', 'Mazovia', 'Poland', 'PL', 'Europe')
+    for entity in (europe, poland, mazovia, warsaw):
+        assert type(entity).from_record(entity.record) == entity
+
+
+def test_locations_result_lazy_views():
+    locations = LocationsResult([europe], [poland, germany], [mazovia], [])
+
+    continents, countries, regions, cities = locations
+
+    assert countries == [poland, germany]
+    assert locations.to_sorted()[1] == [germany, poland]
+    assert locations.to_sorted() is locations.to_sorted()
+    assert locations.to_strings() == (
+        ['Europe'],
+        ['Germany, Europe', 'Poland, Europe'],
+        ['Mazovia, Poland, Europe'],
+        [],
+    )
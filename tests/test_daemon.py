@@ -0,0 +1,187 @@
+import socket
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from location_extractor import daemon
+from location_extractor.daemon import DaemonDBClient, DaemonError, LookupServer
+from location_extractor.extractor import Extractor
+
+
+def _timeout(connection):
+    raise socket.timeout()
+
+
+@pytest.fixture(name='lookup_server')
+def create_lookup_server(tmp_path, fixture_dbclient):
+    server = LookupServer(str(tmp_path / 'lookup.sock'), fixture_dbclient)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name='daemon_dbclient')
+def create_daemon_dbclient(lookup_server):
+    client = DaemonDBClient(lookup_server.server_address)
+    yield client
+    client.close()
+
+
+def test_daemon_dbclient_matches_dbclient(daemon_dbclient, fixture_dbclient):
+    names = ['Berlin', 'Paris']
+    columns = ('country_name', 'city_name')
+
+    assert daemon_dbclient.fetch_all('city_name', 'Berlin') == (
+        fixture_dbclient.fetch_all('city_name', 'Berlin')
+    )
+    assert daemon_dbclient.fetch_all_raw('city_name', names, columns) == (
+        fixture_dbclient.fetch_all_raw('city_name', names, columns)
+    )
+    assert daemon_dbclient.fetch_one_raw(
+        'country_iso_code',
+        'PL',
+        'country_name',
+    ) == ('Poland',)
+    assert daemon_dbclient.fetch_one_raw('city_name', 'Atlantis') is None
+
+
+def test_daemon_dbclient_indexes(daemon_dbclient, fixture_dbclient):
+    assert daemon_dbclient.name_index == fixture_dbclient.name_index
+    assert 'warsaw' in daemon_dbclient.names_filter
+
+
+def test_daemon_dbclient_lookup_names_is_cached(daemon_dbclient):
+    hits = daemon_dbclient.lookup_names(['Berlin', 'Atlantis'])
+    cached_hits = daemon_dbclient.lookup_names(['berlin', 'Atlantis'])
+
+    assert hits.names == cached_hits.names == {'berlin', 'atlantis'}
+    assert sorted(cached_hits.records('berlin', 'city_name')) == [
+        ('Berlin', 'Connecticut', 'United States', 'US', 'North America'),
+        ('Berlin', 'Land Berlin', 'Germany', 'DE', 'Europe'),
+        ('Berlin', 'New York', 'United States', 'US', 'North America'),
+        ('Berlin', 'Schleswig-Holstein', 'Germany', 'DE', 'Europe'),
+        ('Berlin', 'Wisconsin', 'United States', 'US', 'North America'),
+    ]
+    assert not cached_hits.records('atlantis', 'city_name')
+    stats = daemon_dbclient.cache_stats()
+    assert (stats.hits, stats.misses) == (2, 2)
+
+
+def test_daemon_cache_size(lookup_server, daemon_dbclient):
+    lookup_server.cache_size = 2
+
+    daemon_dbclient.lookup_names(['Berlin', 'Paris', 'Warsaw'])
+
+    assert list(lookup_server.cache) == ['paris', 'warsaw']
+
+
+def test_daemon_dbclient_errors(daemon_dbclient):
+    with pytest.raises(DaemonError):
+        daemon_dbclient.call('update_locations_table', 'locations.csv')
+
+
+def test_daemon_closes_interrupted_connection(
+    daemon_dbclient,
+    monkeypatch,
+):
+    daemon_dbclient.cache_stats()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(daemon, 'receive_message', _timeout)
+        with pytest.raises(socket.timeout):
+            daemon_dbclient.cache_stats()
+
+    assert daemon_dbclient._connection is None  # noqa: WPS437
+    assert daemon_dbclient.fetch_one_raw(
+        'country_iso_code',
+        'PL',
+        'country_name',
+    ) == ('Poland',)
+
+
+def test_daemon_dbclient_shared_by_threads(daemon_dbclient):
+    names = [
+        name
+        for _ in range(10)
+        for name in ('Berlin', 'Paris', 'Warsaw', 'London')
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        records = list(executor.map(
+            lambda name: daemon_dbclient.fetch_one_raw(
+                'city_name',
+                name,
+                'city_name',
+            ),
+            names,
+        ))
+
+    assert records == [(name,) for name in names]
+
+
+def test_lookup_server_refuses_running_daemon(
+    lookup_server,
+    fixture_dbclient,
+):
+    with pytest.raises(DaemonError):
+        LookupServer(lookup_server.server_address, fixture_dbclient)
+
+
+def test_lookup_server_replaces_stale_socket(tmp_path, fixture_dbclient):
+    path = str(tmp_path / 'lookup.sock')
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(path)
+
+    server = LookupServer(path, fixture_dbclient)
+    server.server_close()
+
+
+def test_lookup_server_refuses_regular_file(tmp_path, fixture_dbclient):
+    path = tmp_path / 'lookup.sock'
+    path.write_text('data')
+
+    with pytest.raises(DaemonError, match='is not a socket'):
+        LookupServer(str(path), fixture_dbclient)
+
+    assert path.read_text() == 'data'
+
+
+def test_daemon_dbclient_sees_updated_database(
+    daemon_dbclient,
+    fixture_dbclient,
+    tmp_path,
+):
+    updated_path = tmp_path / 'locations-updated.csv'
+    with open(fixture_dbclient.locations_path) as locations_file:
+        rows = locations_file.read()
+    updated_path.write_text(f'{rows}en,EU,Europe,ES,Spain,,Madrid,True\n')
+    assert 'madrid' not in daemon_dbclient.name_index.cities
+    assert not daemon_dbclient.lookup_names(['Madrid']).records(
+        'madrid',
+        'city_name',
+    )
+
+    fixture_dbclient.update_locations_table(str(updated_path))
+
+    hits = daemon_dbclient.lookup_names(['Madrid'])
+    assert hits.records('madrid', 'city_name') == [
+        ('Madrid', '', 'Spain', 'ES', 'Europe'),
+    ]
+    assert 'madrid' in daemon_dbclient.name_index.cities
+    assert 'madrid' in daemon_dbclient.names_filter
+
+
+def test_extractor_with_daemon_dbclient(daemon_dbclient, fixture_extractor):
+    extractor = Extractor(dbclient=daemon_dbclient)
+
+    assert extractor.extract_locations(
+        'Berlin, Germany',
+        return_strings=True,
+    ) == fixture_extractor.extract_locations(
+        'Berlin, Germany',
+        return_strings=True,
+    )
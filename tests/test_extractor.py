@@ -1,6 +1,8 @@
 import pytest
 
 from location_extractor.containers import City, Continent, Country, Region
+from location_extractor.extractor import Extractor
+from location_extractor.serialization import unpack
 
 
 def test_kenya(location_extractor):
@@ -167,3 +169,334 @@ def test_extract_location(location_extractor):
     assert {country.name for country in locations[1]} == {'Germany'}
     assert all(isinstance(city, City) for city in locations[3])
     assert {city.name for city in locations[3]} == {'Berlin'}
+
+
+@pytest.mark.parametrize(('text', 'expected_places'), [
+    ('Warsaw', ['Warsaw']),
+    ('Kraków, Poland', ['Kraków', 'Poland']),
+    ('Berlin; Germany | Western Europe', ['Berlin', 'Germany', 'Europe']),
+    ('Warsaw Poland', ['Warsaw', 'Poland']),
+    ('Floods in Warsaw', ['Warsaw']),
+    ('From Berlin to Kraków, Poland', ['Berlin', 'Kraków', 'Poland']),
+])
+def test_extract_places_short_text(
+    text,
+    expected_places,
+    fixture_extractor,
+    monkeypatch,
+):
+    """Ensure short texts made of location names skip NER."""
+    monkeypatch.setattr(fixture_extractor, 'extractor', None)
+
+    assert fixture_extractor.extract_places(text) == expected_places
+
+
+@pytest.mark.parametrize('text', [
+    'warsaw',
+    'Person living in Warsaw',
+    'Warsaw, Atlantis',
+    'Floods Hit Warsaw',
+    'Warsaw, floods in Poland',
+    'Warsaw is the capital of Poland, which is in Central Europe',
+])
+def test_short_text_places_not_definitive(text, fixture_extractor):
+    assert fixture_extractor.short_text_places(text) is None
+
+
+@pytest.mark.parametrize(('word', 'is_location', 'is_country'), [
+    ('poland', True, True),
+    ('Kraków', True, False),
+    ('mazovia', True, False),
+])
+def test_name_index_definitive_matches(
+    word,
+    is_location,
+    is_country,
+    fixture_extractor,
+):
+    assert fixture_extractor.is_location(word) is is_location
+    assert fixture_extractor.is_country(word) is is_country
+
+
+@pytest.mark.parametrize(('word', 'is_location', 'is_country'), [
+    ('europe', False, False),
+    ('atlantis', False, False),
+    ('The UK', True, True),
+    ('us', True, True),
+    ('is', True, True),
+])
+def test_existence_checks_do_not_resolve_entities(
+    word,
+    is_location,
+    is_country,
+    fixture_extractor,
+    monkeypatch,
+):
+    monkeypatch.setattr(fixture_extractor, 'find_locations', None)
+    monkeypatch.setattr(fixture_extractor, 'get_countries', None)
+
+    assert fixture_extractor.is_location(word) is is_location
+    assert fixture_extractor.is_country(word) is is_country
+
+
+@pytest.mark.parametrize('word', ['atlantis', 'fuzzle', 'ZZ', 'the xx'])
+def test_existence_checks_misses_do_not_query(
+    word,
+    fixture_extractor,
+    monkeypatch,
+):
+    monkeypatch.setattr(fixture_extractor.dbclient, 'fetch_one_raw', None)
+    monkeypatch.setattr(fixture_extractor.dbclient, 'fetch_all_raw', None)
+
+    assert not fixture_extractor.is_location(word)
+    assert not fixture_extractor.is_country(word)
+
+
+def test_find_locations_unsorted(fixture_extractor):
+    places = ['Poland', 'Germany', 'Berlin']
+
+    unsorted = fixture_extractor.find_locations(places, sort=False)
+    locations = fixture_extractor.find_locations(places)
+
+    assert tuple(map(sorted, unsorted)) == locations
+
+
+def test_extract_compact_locations(fixture_extractor):
+    compact = fixture_extractor.extract_compact_locations('Warsaw, Poland')
+
+    assert unpack(compact) == fixture_extractor.find_locations(
+        ['Warsaw', 'Poland'],
+        sort=False,
+    )
+
+
+@pytest.mark.parametrize(('entity_class', 'name', 'column_name'), [
+    (Continent, 'Europe', 'continent_name'),
+    (Country, 'United States', 'country_name'),
+])
+def test_entities_by_name_fetches_distinct(
+    entity_class,
+    name,
+    column_name,
+    fixture_extractor,
+):
+    entities = fixture_extractor.entities_by_name(
+        entity_class,
+        name,
+        column_name,
+    )
+
+    assert len(entities) == 1
+    assert entities[0].name == name
+
+
+def test_select_candidates(fixture_extractor):
+    places = ['John Smith', 'Warsaw', 'The UK', 'us', 'Acme Corporation']
+
+    candidates = fixture_extractor.select_candidates(places)
+
+    assert candidates == ['Warsaw', 'The UK', 'us']
+    assert fixture_extractor.candidates_stats.checked == 5
+    assert fixture_extractor.candidates_stats.rejected == 2
+
+
+@pytest.mark.parametrize('places', [
+    ['Poland', 'Warsaw', 'Berlin'],
+    ['The UK', 'London', 'us', 'Massachusetts', 'Worcester'],
+    ['Europe', 'Paris', 'Texas', 'Kraków'],
+])
+def test_find_locations_single_lookup(places, fixture_extractor, monkeypatch):
+    expected = fixture_extractor.find_locations(places)
+    monkeypatch.setattr(fixture_extractor.dbclient, 'fetch_all_raw', None)
+    monkeypatch.setattr(fixture_extractor.dbclient, 'fetch_one_raw', None)
+
+    assert fixture_extractor.find_locations(places) == expected
+
+
+def test_extract_locations_windowed(location_extractor):
+    text = 'Person living in Berlin, Germany. ' * 100
+
+    locations = location_extractor.extract_locations(
+        text,
+        return_strings=True,
+        windowed=True,
+    )
+
+    assert locations == location_extractor.extract_locations(
+        'Person living in Berlin, Germany',
+        return_strings=True,
+    )
+
+
+def test_extract_locations_within_budget(fixture_extractor):
+    locations = fixture_extractor.extract_locations_within(
+        'Berlin, Germany',
+        budget=60,
+    )
+
+    assert not locations.partial
+    assert locations.to_strings() == fixture_extractor.extract_locations(
+        'Berlin, Germany',
+        return_strings=True,
+    )
+
+
+def test_extract_locations_within_exceeded_budget(fixture_extractor):
+    locations = fixture_extractor.extract_locations_within(
+        'Berlin, Germany',
+        budget=0,
+    )
+
+    assert locations.partial
+    assert Country.many_to_string(locations.countries) == ['Germany, Europe']
+    assert (locations.regions, locations.cities) == ([], [])
+
+
+def test_extract_within_caps_only_when_hurried(
+    fixture_extractor,
+):
+    fixture_extractor.budget_max_candidates = 2
+
+    locations = fixture_extractor.extract_locations_within(
+        'Berlin, Wisconsin',
+        budget=60,
+    )
+
+    assert not locations.partial
+    assert not fixture_extractor.cities_stats.capped
+    assert locations.to_strings() == fixture_extractor.extract_locations(
+        'Berlin, Wisconsin',
+        return_strings=True,
+    )
+
+
+def test_extract_within_cap_keeps_context_cities(
+    fixture_extractor,
+):
+    fixture_extractor.budget_max_candidates = 1
+    fixture_extractor.budget_candidates_share = 0
+
+    locations = fixture_extractor.extract_locations_within(
+        'Berlin, Wisconsin',
+        budget=60,
+    )
+
+    assert locations.partial
+    assert City.many_to_string(locations.cities) == [
+        'Berlin, Wisconsin, United States, North America',
+    ]
+
+
+def test_resolve_locations_caps_candidates(fixture_extractor):
+    locations = fixture_extractor.resolve_locations(
+        ['Berlin'],
+        max_candidates=2,
+    )
+
+    assert locations.partial
+    assert sorted(City.many_to_string(locations.cities)) == [
+        'Berlin, Connecticut, United States, North America',
+        'Berlin, Land Berlin, Germany, Europe',
+    ]
+
+
+@pytest.mark.parametrize(('places', 'expected_cities'), [
+    (
+        ['Berlin'],
+        [
+            'Berlin, Connecticut, United States, North America',
+            'Berlin, Land Berlin, Germany, Europe',
+        ],
+    ),
+    (
+        ['Berlin', 'Wisconsin'],
+        ['Berlin, Wisconsin, United States, North America'],
+    ),
+    (
+        ['Berlin', 'Germany'],
+        [
+            'Berlin, Land Berlin, Germany, Europe',
+            'Berlin, Schleswig-Holstein, Germany, Europe',
+        ],
+    ),
+])
+def test_max_cities_per_name_prunes_context_first(
+    places,
+    expected_cities,
+    fixture_extractor,
+):
+    fixture_extractor.max_cities_per_name = 2
+
+    locations = fixture_extractor.resolve_locations(places)
+
+    assert sorted(City.many_to_string(locations.cities)) == expected_cities
+    assert fixture_extractor.cities_stats.capped == 1
+    assert fixture_extractor.cities_stats.dropped == 3
+
+
+def test_max_cities_per_name_not_exceeded(fixture_extractor):
+    fixture_extractor.max_cities_per_name = 5
+
+    locations = fixture_extractor.resolve_locations(['Berlin'])
+
+    assert len(locations.cities) == 5
+    assert fixture_extractor.cities_stats.checked == 1
+    assert not fixture_extractor.cities_stats.capped
+
+
+def test_extractor_with_multiple_locales(fixture_sharded_dbclient):
+    extractor = Extractor(dbclient=fixture_sharded_dbclient)
+
+    locations = extractor.extract_locations('Prag, Warschau, Poland')
+
+    assert City.many_to_string(locations[3]) == [
+        'Warschau, Masowien, Polen, Europa',
+        'Prag, Hauptstadt Prag, Tschechien, Europa',
+    ]
+    assert Country.many_to_string(locations[1]) == ['Poland, Europe']
+
+
+def test_extract_locations_incremental(fixture_extractor, monkeypatch):
+    extract_places = fixture_extractor.extract_places
+    lookup_names = fixture_extractor.dbclient.lookup_names
+    processed_paragraphs = []
+    probed_names = []
+
+    # spies close over the original methods and their records
+    def spy_extract_places(paragraph):  # noqa: WPS430
+        processed_paragraphs.append(paragraph)
+        return extract_places(paragraph)
+
+    def spy_lookup_names(names):  # noqa: WPS430
+        hits = lookup_names(names)
+        probed_names.extend(hits.names)
+        return hits
+
+    monkeypatch.setattr(
+        fixture_extractor,
+        'extract_places',
+        spy_extract_places,
+    )
+    monkeypatch.setattr(
+        fixture_extractor.dbclient,
+        'lookup_names',
+        spy_lookup_names,
+    )
+
+    _, state = fixture_extractor.extract_locations_incremental(
+        'Warsaw, Poland\n\nBerlin, Germany',
+    )
+    processed_paragraphs.clear()
+    probed_names.clear()
+    locations, state = fixture_extractor.extract_locations_incremental(
+        'Warsaw, Poland\n\n  \nParis, France',
+        state,
+    )
+
+    assert processed_paragraphs == ['Paris, France']
+    assert 'warsaw' not in probed_names
+    assert 'paris' in probed_names
+    assert list(state.paragraphs) == ['Warsaw, Poland', 'Paris, France']
+    assert locations.to_strings() == fixture_extractor.resolve_locations(
+        ['Warsaw', 'Poland', 'Paris', 'France'],
+    ).to_strings()
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+
+from functools import partial
+from unittest import mock
+
+import pytest
+
+from location_extractor import memory
+from location_extractor.clients import DBClient
+from location_extractor.extractor import Extractor
+from location_extractor.memory import (
+    allocations_peak,
+    components_sizes,
+    deep_sizeof,
+    memory_usage,
+)
+from location_extractor.synthetic import GazetteerSpec, write_locations_csv
+
+BUDGETS_PATH = os.path.join(
+    os.path.dirname(__file__),
+    'fixtures',
+    'memory-budgets.json',
+)
+
+
+@pytest.fixture(scope='module', name='memory_budgets')
+def load_memory_budgets():
+    with open(BUDGETS_PATH) as budgets:
+        return json.load(budgets)
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = ['warsaw' for _ in range(100)]
+    nested = [shared, shared]
+
+    assert deep_sizeof([]) < deep_sizeof(shared) < deep_sizeof(nested)
+    assert deep_sizeof(nested) < 2 * deep_sizeof(shared)
+    assert components_sizes({'first': shared, 'second': nested}) == {
+        'first': deep_sizeof(shared),
+        'second': sys.getsizeof(nested),
+    }
+
+
+def test_allocations_peak():
+    allocated, peak = allocations_peak(partial(bytearray, 1024 * 1024))
+
+    assert len(allocated) == 1024 * 1024
+    assert 1024 * 1024 <= peak < 2 * 1024 * 1024
+
+
+def test_memory_usage_without_proc_and_resource(monkeypatch):
+    monkeypatch.setattr(
+        memory,
+        'open',
+        mock.Mock(side_effect=FileNotFoundError),
+        raising=False,
+    )
+    monkeypatch.setitem(sys.modules, 'resource', None)
+
+    assert memory_usage() == (0, None)
+
+
+def test_fixture_gazetteer_memory_budget(fixture_extractor, memory_budgets):
+    report = fixture_extractor.memory_report(include_models=False)
+
+    assert report.components.keys() == memory_budgets['fixture'].keys()
+    for component, budget in memory_budgets['fixture'].items():
+        assert 0 < report.components[component] <= budget
+    assert report.rss > report.total
+
+
+def test_models_memory_budget(fixture_extractor, memory_budgets):
+    if 'models' not in memory_budgets:
+        pytest.skip('memory of NLTK models is not measured yet')
+    try:
+        report = fixture_extractor.memory_report()
+    except LookupError:
+        pytest.skip('NLTK models are not downloaded')
+
+    for component, budget in memory_budgets['models'].items():
+        assert 0 < report.components[component] <= budget
+
+
+def test_synthetic_gazetteer_memory_budget(tmp_path, memory_budgets):
+    locations_path = str(tmp_path / 'locations.csv')
+    write_locations_csv(GazetteerSpec(scale=0.1), locations_path)
+    extractor = Extractor(dbclient=DBClient(
+        dbpath=str(tmp_path / 'data.db'),
+        locations_path=locations_path,
+    ))
+
+    report = extractor.memory_report(include_models=False)
+
+    for component, budget in memory_budgets['synthetic'].items():
+        assert 0 < report.components[component] <= budget
+
+
+@pytest.mark.parametrize(('text', 'budget_name'), [
+    ('Warsaw, Poland', 'extract_locations'),
+    ('Berlin, Germany, Europe', 'extract_locations'),
+    ('Paris; Texas; United States', 'extract_locations'),
+    (
+        ' '.join((
+            'The plumber moved from Krakow to Berlin last year and now works',
+            'in Germany for a company based in Warsaw, Poland.',
+        )),
+        'extract_locations_ner',
+    ),
+])
+def test_extract_locations_allocations_budget(
+    text,
+    budget_name,
+    fixture_extractor,
+    memory_budgets,
+):
+    if budget_name not in memory_budgets:
+        pytest.skip(f'{budget_name} allocations are not measured yet')
+    # the first call loads models and builds indexes
+    try:
+        fixture_extractor.extract_locations(text)
+    except LookupError:
+        pytest.skip('NLTK models are not downloaded')
+
+    _, peak = allocations_peak(
+        partial(fixture_extractor.extract_locations, text),
+    )
+
+    assert peak <= memory_budgets[budget_name]
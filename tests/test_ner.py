@@ -1,3 +1,8 @@
+from location_extractor.named_entity_recognition.ner import NERExtractor
+
+WINDOW_SIZE = 50
+
+
 def test_extract_from_tweet(ner_extractor):
     text = '''
     Perfect just Perfect! It's a perfect storm for Nairobi on a
@@ -42,3 +47,25 @@ def test_extract_from_text(ner_extractor):
     assert len(places) == 2
     assert 'São Paulo' in places
     assert 'Brazil' in places
+
+
+def test_extract_with_regex_tokenizer():
+    text = ' There is a city called São Paulo in Brazil.'
+    places = NERExtractor(tokenizer='regex').find_entities(text=text)
+
+    assert places == ['São Paulo', 'Brazil']
+
+
+def test_iter_entities(ner_extractor):
+    text = 'There is a city called São Paulo in Brazil. ' * 3
+
+    places = list(ner_extractor.iter_entities(text, window_size=WINDOW_SIZE))
+
+    assert places == [
+        'São Paulo',
+        'Brazil',
+        'São Paulo',
+        'Brazil',
+        'São Paulo',
+        'Brazil',
+    ]
@@ -0,0 +1,107 @@
+import json
+import pstats
+import tracemalloc
+
+from unittest import mock
+
+from location_extractor.extractor import Extractor
+from location_extractor.profiling import (
+    PROFILE_SUFFIX,
+    REPORT_SUFFIX,
+    SNAPSHOT_SUFFIX,
+    Profiler,
+)
+
+
+def test_profiler_reports_slow_calls(tmp_path, fixture_dbclient):
+    profiler = Profiler(str(tmp_path / 'profiles'), threshold=0)
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    text = 'Warsaw, Poland, Europe'
+
+    extractor.extract_locations(text)
+
+    [stem] = profiler.reports()
+    with open(f'{stem}{REPORT_SUFFIX}') as report_file:
+        report = json.load(report_file)
+    assert report['text_size'] == len(text)
+    assert report['places_count'] == report['candidates_count'] == 3
+    assert report['locations_count'] == 3
+    assert report['duration'] > 0
+
+
+def test_profiler_writes_profiles(tmp_path, fixture_dbclient):
+    profiler = Profiler(
+        str(tmp_path / 'profiles'),
+        threshold=0,
+        trace_allocations=True,
+    )
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    extractor.extract_locations('Warsaw, Poland, Europe')
+
+    [stem] = profiler.reports()
+    assert pstats.Stats(f'{stem}{PROFILE_SUFFIX}').total_calls
+    assert tracemalloc.Snapshot.load(f'{stem}{SNAPSHOT_SUFFIX}').traces
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiler_skips_fast_calls(tmp_path, fixture_dbclient):
+    profiler = Profiler(
+        str(tmp_path / 'profiles'),
+        threshold=60,
+        sample_rate=0,
+    )
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    extractor.extract_locations('Warsaw, Poland')
+
+    assert not profiler.reports()
+
+
+def test_profiler_skips_snapshots_of_fast_calls(
+    tmp_path,
+    fixture_dbclient,
+    monkeypatch,
+):
+    take_snapshot = mock.Mock(wraps=tracemalloc.take_snapshot)
+    monkeypatch.setattr(tracemalloc, 'take_snapshot', take_snapshot)
+    profiler = Profiler(
+        str(tmp_path / 'profiles'),
+        threshold=60,
+        trace_allocations=True,
+    )
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    extractor.extract_locations('Warsaw, Poland')
+
+    assert not profiler.reports()
+    take_snapshot.assert_not_called()
+
+
+def test_profiler_samples_calls(tmp_path, fixture_dbclient):
+    profiler = Profiler(
+        str(tmp_path / 'profiles'),
+        threshold=60,
+        sample_rate=1,
+    )
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    extractor.extract_locations('Warsaw, Poland', return_strings=True)
+
+    assert len(profiler.reports()) == 1
+
+
+def test_profiler_retention_limit(tmp_path, fixture_dbclient):
+    profiler = Profiler(
+        str(tmp_path / 'profiles'),
+        threshold=0,
+        max_reports=2,
+    )
+    extractor = Extractor(dbclient=fixture_dbclient, profiler=profiler)
+
+    for text in ('Warsaw', 'Poland', 'Berlin', 'Germany', 'Europe'):
+        extractor.extract_locations(text)
+
+    assert len(profiler.reports()) == 2
+    assert len(list((tmp_path / 'profiles').iterdir())) == 4
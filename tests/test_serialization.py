@@ -0,0 +1,39 @@
+import pickle  # noqa: S403
+
+from location_extractor import serialization
+from location_extractor.containers import City, Continent, Country, Region
+
+europe = Continent(name='Europe')
+poland = Country(name='Poland', iso_code='PL', continent=europe)
+mazovia = Region(name='Mazovia', country=poland)
+locations = (
+    [europe],
+    [poland],
+    [mazovia],
+    [
+        City(name='Warsaw', region=mazovia, country=poland),
+        City(name='Pruszków', region=None, country=poland),
+    ],
+)
+
+
+def test_pack_shares_strings():
+    compact = serialization.pack(locations)
+
+    assert compact.strings == (
+        'Europe', 'Poland', 'PL', 'Mazovia', 'Warsaw', 'Pruszków',
+    )
+    assert compact.cities == (
+        (4, 3, 1, 2, 0),
+        (5, -1, 1, 2, 0),
+    )
+
+
+def test_roundtrip():
+    compact = serialization.pack(locations)
+
+    assert serialization.unpack(compact) == locations
+    assert serialization.loads(serialization.dumps(compact)) == compact
+    # pickles are created by the test itself
+    assert pickle.loads(pickle.dumps(compact)) == compact  # noqa: S301
+    assert len(pickle.dumps(compact)) < len(pickle.dumps(locations))
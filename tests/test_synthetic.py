@@ -0,0 +1,62 @@
+import csv
+
+from collections import Counter
+
+from location_extractor.clients import LOCATIONS_COLUMNS, DBClient
+from location_extractor.synthetic import (
+    GazetteerSpec,
+    generate_locations,
+    write_locations_csv,
+)
+
+
+def _city_names(spec):
+    return [
+        city_name
+        for *_, city_name, _ in generate_locations(spec)
+        if city_name
+    ]
+
+
+def test_generate_locations_is_deterministic():
+    spec = GazetteerSpec(scale=0.1, seed=7)
+
+    assert list(generate_locations(spec)) == list(generate_locations(spec))
+    assert list(generate_locations(spec)) != list(
+        generate_locations(GazetteerSpec(scale=0.1, seed=8)),
+    )
+
+
+def test_generate_locations_scale():
+    spec = GazetteerSpec(scale=0.2, countries_count=10)
+
+    assert len(_city_names(spec)) == spec.cities_count == 2000
+    assert len(list(generate_locations(spec))) == 2010
+
+
+def test_generate_locations_ambiguity():
+    unique = Counter(_city_names(GazetteerSpec(scale=0.1, ambiguity=0)))
+    ambiguous = Counter(_city_names(GazetteerSpec(scale=0.1, ambiguity=0.5)))
+
+    most_ambiguous = ambiguous.most_common(1)[0][1]
+    most_unique = unique.most_common(1)[0][1]
+
+    assert len(ambiguous) < len(unique)
+    assert most_ambiguous > most_unique
+
+
+def test_write_locations_csv_is_loadable(tmp_path):
+    spec = GazetteerSpec(scale=0.05, countries_count=5)
+    locations_path = str(tmp_path / 'locations.csv')
+
+    rows_count = write_locations_csv(spec, locations_path)
+    dbclient = DBClient(
+        dbpath=str(tmp_path / 'data.db'),
+        locations_path=locations_path,
+    )
+
+    with open(locations_path) as locations_file:
+        assert tuple(next(csv.reader(locations_file))) == LOCATIONS_COLUMNS
+    assert rows_count == 505
+    city_name = _city_names(spec)[0]
+    assert dbclient.fetch_one('city_name', city_name).city_name == city_name
@@ -0,0 +1,63 @@
+import pytest
+
+from nltk.tokenize.destructive import NLTKWordTokenizer
+
+from location_extractor.named_entity_recognition.tokenizers import (
+    iter_windows,
+    regex_word_tokenize,
+)
+
+WINDOW_SIZE = 50
+SENTENCE_WINDOW_SIZE = 30
+
+
+@pytest.mark.parametrize('sentence', [
+    'There is a city called São Paulo in Brazil.',
+    'Person living in Berlin, Germany',
+    "It's a perfect storm for Nairobi on a Friday evening! @Ma3Route",
+    'She said "I don\'t like Mr. Smith\'s dog" in Schleswig-Holstein.',
+    'The U.S. (roughly) paid $3.88 -- or 3,36 euros...',
+    "Campbell's Bay and Ta' Xbiex are far from Côtes-d'Armor.",
+    "She flew from O'Hare to the Departement de l'Ouest.",
+])
+def test_regex_word_tokenize_matches_treebank(sentence):
+    expected_tokens = NLTKWordTokenizer().tokenize(sentence)
+
+    assert regex_word_tokenize(sentence) == expected_tokens
+
+
+def test_regex_word_tokenize_keeps_urls():
+    tokens = regex_word_tokenize('Cycling in Nairobi: http://example.com/a-b')
+
+    assert tokens[-2:] == [':', 'http://example.com/a-b']
+
+
+def test_iter_windows_ends_at_sentences():
+    text = 'Warsaw is in Poland. Berlin is in Germany.\n\nParis is in France.'
+
+    windows = list(iter_windows(text, window_size=SENTENCE_WINDOW_SIZE))
+
+    assert windows == [
+        'Warsaw is in Poland. ',
+        'Berlin is in Germany.\n\n',
+        'Paris is in France.',
+    ]
+
+
+def test_iter_windows_of_text_parts():
+    parts = ['Warsaw is in Poland and ', 'Berlin is in Germany ', 'too']
+
+    windows = list(iter_windows(iter(parts), window_size=24))
+
+    assert ''.join(windows) == ''.join(parts)
+    assert all(len(window) <= 24 for window in windows)
+    assert windows[0] == 'Warsaw is in Poland and '
+
+
+def test_iter_windows_of_large_text_parts():
+    text = 'Warsaw is in Poland. ' * 100
+
+    windows = list(iter_windows(iter([text, text]), window_size=WINDOW_SIZE))
+
+    assert windows == list(iter_windows(text * 2, window_size=WINDOW_SIZE))
+    assert all(len(window) <= WINDOW_SIZE for window in windows)
@@ -1,6 +1,6 @@
 import pytest
 
-from location_extractor.utils import fuzzy_match
+from location_extractor.utils import atomic_write, fuzzy_match
 
 
 @pytest.mark.parametrize(('name', 'option', 'expected'), [
@@ -15,3 +15,31 @@ from location_extractor.utils import fuzzy_match
 ])
 def test_fuzzy_match(name, option, expected):
     assert fuzzy_match(name.lower(), option.lower()) is expected
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / 'names.bloom'
+    path.write_text('old')
+
+    with atomic_write(str(path)) as tmp_file_path:
+        with open(tmp_file_path, 'w') as tmp_file:
+            tmp_file.write('new')
+
+    assert path.read_text() == 'new'
+    assert [child.name for child in tmp_path.iterdir()] == ['names.bloom']
+
+
+def test_atomic_write_cleans_up_on_failure(tmp_path):
+    path = tmp_path / 'names.bloom'
+    path.write_text('old')
+
+    with pytest.raises(ValueError, match='failed write'):
+        _fail_writing(str(path))
+
+    assert path.read_text() == 'old'
+    assert [child.name for child in tmp_path.iterdir()] == ['names.bloom']
+
+
+def _fail_writing(path):
+    with atomic_write(path):
+        raise ValueError('failed write')
@@ -0,0 +1,17 @@
+from location_extractor.serialization import unpack
+from location_extractor.workers import WarmPool
+
+
+def test_warm_pool(fixture_extractor):
+    texts = ['Warsaw, Poland', 'Berlin, Germany']
+
+    with WarmPool(2, fixture_extractor, load_models=False) as pool:
+        compact_locations = pool.map(texts)
+        stats = pool.workers_stats
+
+    assert [unpack(compact) for compact in compact_locations] == [
+        fixture_extractor.find_locations(text.split(', '), sort=False)
+        for text in texts
+    ]
+    assert len({worker.pid for worker in stats}) == 2
+    assert all(worker.rss > 0 for worker in stats)